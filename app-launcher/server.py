@@ -5,11 +5,17 @@ Lists installed apps and launches them on Windows.
 """
 
 import asyncio
+import ctypes
+import functools
+import itertools
 import json
 import os
 import sys
+import threading
 import time
 import subprocess
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -18,6 +24,44 @@ try:
 except Exception:
     winreg = None
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+try:
+    import pythoncom  # type: ignore
+    import win32com.client  # type: ignore
+except Exception:
+    pythoncom = None
+    win32com = None
+
+_RegQueryMultipleValuesW = None
+if sys.platform == "win32":
+    try:
+        from ctypes import wintypes
+
+        class _VALENTW(ctypes.Structure):
+            _fields_ = [
+                ("ve_valuename", wintypes.LPWSTR),
+                ("ve_valuelen", wintypes.DWORD),
+                ("ve_valueptr", ctypes.c_size_t),
+                ("ve_type", wintypes.DWORD),
+            ]
+
+        _advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+        _RegQueryMultipleValuesW = _advapi32.RegQueryMultipleValuesW
+        _RegQueryMultipleValuesW.argtypes = [
+            wintypes.HKEY,
+            ctypes.POINTER(_VALENTW),
+            wintypes.DWORD,
+            ctypes.c_void_p,
+            ctypes.POINTER(wintypes.DWORD),
+        ]
+        _RegQueryMultipleValuesW.restype = wintypes.LONG
+    except Exception:
+        _RegQueryMultipleValuesW = None
+
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
@@ -25,16 +69,54 @@ from mcp.server.stdio import stdio_server
 server = Server("app-launcher")
 
 CACHE_TTL_SECONDS = 300
+CACHE_FILE = Path(os.environ.get("LOCALAPPDATA") or Path.home()) / "app-launcher" / "apps.json"
 _APP_CACHE = {
     "timestamp": 0.0,
     "apps": []
 }
 
+def _load_disk_cache() -> None:
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        timestamp = float(data["timestamp"])
+        apps = data["apps"]
+    except Exception:
+        return
+    if isinstance(apps, list) and time.time() - timestamp < CACHE_TTL_SECONDS:
+        _APP_CACHE["apps"] = apps
+        _APP_CACHE["timestamp"] = timestamp
+
+def _save_disk_cache() -> None:
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_FILE.with_name(f"{CACHE_FILE.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_APP_CACHE, f)
+        os.replace(tmp_path, CACHE_FILE)
+    except Exception:
+        pass
+
+_load_disk_cache()
+
+# Compact output for MCP clients; set APP_LAUNCHER_PRETTY_JSON=1 when debugging
+_PRETTY_JSON = os.environ.get("APP_LAUNCHER_PRETTY_JSON") == "1"
+
+def _dumps(payload) -> str:
+    if _PRETTY_JSON:
+        return json.dumps(payload, indent=2)
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload)
+
 def _now_utc_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 def _normalize_name(name: str) -> str:
-    return name.strip().casefold()
+    # lower() equals casefold() for ASCII and skips the full case-fold table;
+    # interning lets equal keys share one object in the dedup dict.
+    name = name.strip()
+    return sys.intern(name.lower() if name.isascii() else name.casefold())
 
 def _reg_get(key, value_name: str):
     try:
@@ -43,6 +125,65 @@ def _reg_get(key, value_name: str):
     except Exception:
         return None
 
+_UNINSTALL_VALUES = ("DisplayName", "DisplayVersion", "Publisher", "InstallLocation", "DisplayIcon")
+_ERROR_MORE_DATA = 234
+_REG_STRING_TYPES = (1, 2)  # REG_SZ, REG_EXPAND_SZ
+
+def _reg_query_multiple(key, value_names: tuple[str, ...]) -> dict | None:
+    """Read several string values in one RegQueryMultipleValuesW call.
+
+    Values that aren't strings are read on their own with _reg_get. Returns
+    None when any value is missing, since the API fails the whole batch in
+    that case; callers fall back to _reg_get.
+    """
+    count = len(value_names)
+    entries = (_VALENTW * count)()
+    for i, value_name in enumerate(value_names):
+        entries[i].ve_valuename = value_name
+
+    size = 4096
+    while True:
+        buf = ctypes.create_string_buffer(size)
+        total = wintypes.DWORD(size)
+        status = _RegQueryMultipleValuesW(key.handle, entries, count, buf, ctypes.byref(total))
+        if status == _ERROR_MORE_DATA:
+            size = max(total.value, size * 2)
+            continue
+        if status != 0:
+            return None
+        break
+
+    base = ctypes.addressof(buf)
+    values = {}
+    for entry in entries:
+        if entry.ve_type not in _REG_STRING_TYPES:
+            values[entry.ve_valuename] = _reg_get(key, entry.ve_valuename)
+            continue
+        offset = entry.ve_valueptr - base
+        raw = buf.raw[offset:offset + entry.ve_valuelen].decode("utf-16-le")
+        values[entry.ve_valuename] = raw.split("\x00", 1)[0]
+    return values
+
+def _reg_get_uninstall_values(key) -> dict:
+    # Most subkeys (updates, components) have no DisplayName, so they cost
+    # one read and never reach the batch
+    name = _reg_get(key, "DisplayName")
+    if not name:
+        return {"DisplayName": None}
+
+    values = None
+    if _RegQueryMultipleValuesW is not None:
+        try:
+            values = _reg_query_multiple(key, _UNINSTALL_VALUES[1:])
+        except Exception:
+            values = None
+    if values is None:
+        values = {value_name: _reg_get(key, value_name) for value_name in _UNINSTALL_VALUES[1:]}
+    values["DisplayName"] = name
+    return values
+
+# DisplayIcon strings repeat across hives and bitness views; parsing is pure.
+@functools.lru_cache(maxsize=2048)
 def _parse_display_icon(display_icon: str | None) -> str | None:
     if not display_icon:
         return None
@@ -50,92 +191,156 @@ def _parse_display_icon(display_icon: str | None) -> str | None:
     if "," in raw:
         raw = raw.split(",", 1)[0].strip().strip('"')
     raw = os.path.expandvars(raw)
-    if raw.lower().endswith(".exe") and os.path.exists(raw):
+    # Existence is checked lazily in launch_app, not once per installed app.
+    if raw.lower().endswith(".exe"):
         return raw
     return None
 
+_INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+_FILE_ATTRIBUTE_DIRECTORY = 0x10
+
+def _exe_exists(path: str) -> bool:
+    if sys.platform == "win32":
+        attrs = ctypes.windll.kernel32.GetFileAttributesW(path) & 0xFFFFFFFF
+        return attrs != _INVALID_FILE_ATTRIBUTES and not attrs & _FILE_ATTRIBUTE_DIRECTORY
+    return os.path.isfile(path)
+
+def _walk_uninstall(root, path: str, access: int) -> list[dict]:
+    apps = []
+    try:
+        with winreg.OpenKey(root, path, 0, access) as key:
+            subkey_count = winreg.QueryInfoKey(key)[0]
+            for i in range(subkey_count):
+                try:
+                    subkey_name = winreg.EnumKey(key, i)
+                    with winreg.OpenKey(key, subkey_name, 0, access) as subkey:
+                        values = _reg_get_uninstall_values(subkey)
+                        name = values["DisplayName"]
+                        if not name:
+                            continue
+                        # A non-string DisplayIcon (e.g. a REG_MULTI_SZ list)
+                        # can't key the parse cache
+                        icon = values["DisplayIcon"]
+                        app = {
+                            "name": str(name).strip(),
+                            "version": values["DisplayVersion"],
+                            "publisher": values["Publisher"],
+                            "install_location": values["InstallLocation"],
+                            "exe_path": _parse_display_icon(str(icon) if icon is not None else None),
+                            "app_id": None,
+                            "sources": ["registry"]
+                        }
+                        apps.append(app)
+                except Exception:
+                    continue
+    except Exception:
+        pass
+    return apps
+
 def _get_registry_apps() -> list[dict]:
     if winreg is None or sys.platform != "win32":
         return []
 
-    apps = []
+    # The 64-bit and 32-bit views of HKLM are selected with access flags rather
+    # than by walking WOW6432Node, so each hive is read exactly once.
+    uninstall_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
     uninstall_keys = [
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-        (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+        (winreg.HKEY_LOCAL_MACHINE, uninstall_path, winreg.KEY_READ | winreg.KEY_WOW64_64KEY),
+        (winreg.HKEY_LOCAL_MACHINE, uninstall_path, winreg.KEY_READ | winreg.KEY_WOW64_32KEY),
+        (winreg.HKEY_CURRENT_USER, uninstall_path, winreg.KEY_READ),
     ]
 
-    for root, path in uninstall_keys:
-        try:
-            with winreg.OpenKey(root, path) as key:
-                subkey_count = winreg.QueryInfoKey(key)[0]
-                for i in range(subkey_count):
-                    try:
-                        subkey_name = winreg.EnumKey(key, i)
-                        with winreg.OpenKey(key, subkey_name) as subkey:
-                            name = _reg_get(subkey, "DisplayName")
-                            if not name:
-                                continue
-                            app = {
-                                "name": str(name).strip(),
-                                "version": _reg_get(subkey, "DisplayVersion"),
-                                "publisher": _reg_get(subkey, "Publisher"),
-                                "install_location": _reg_get(subkey, "InstallLocation"),
-                                "exe_path": _parse_display_icon(_reg_get(subkey, "DisplayIcon")),
-                                "app_id": None,
-                                "sources": ["registry"]
-                            }
-                            apps.append(app)
-                    except Exception:
-                        continue
-        except Exception:
-            continue
+    # winreg releases the GIL around each syscall, so the hive walks overlap.
+    apps = []
+    with ThreadPoolExecutor(max_workers=len(uninstall_keys)) as executor:
+        for hive_apps in executor.map(lambda k: _walk_uninstall(*k), uninstall_keys):
+            apps.extend(hive_apps)
 
     return apps
 
+def _start_app(name, app_id) -> dict | None:
+    if not name or not app_id:
+        return None
+    return {
+        "name": str(name).strip(),
+        "app_id": str(app_id).strip(),
+        "exe_path": None,
+        "version": None,
+        "publisher": None,
+        "install_location": None,
+        "sources": ["startapps"]
+    }
+
+def _get_start_apps_com() -> list[dict]:
+    pythoncom.CoInitialize()
+    try:
+        shell = win32com.client.Dispatch("Shell.Application")
+        folder = shell.NameSpace("shell:AppsFolder")
+        if folder is None:
+            return []
+        apps = []
+        for item in folder.Items():
+            app = _start_app(item.Name, item.Path)
+            if app:
+                apps.append(app)
+        return apps
+    finally:
+        pythoncom.CoUninitialize()
+
 def _get_start_apps() -> list[dict]:
     if sys.platform != "win32":
         return []
 
+    if win32com is not None:
+        try:
+            return _get_start_apps_com()
+        except Exception:
+            pass
+
+    return _get_start_apps_powershell()
+
+START_APPS_TIMEOUT_SECONDS = 10
+
+def _get_start_apps_powershell() -> list[dict]:
+    # One tab-separated record per line so output can be parsed as it streams
+    # instead of buffering and decoding one large JSON document.
     cmd = [
         "powershell",
         "-NoProfile",
         "-Command",
-        "Get-StartApps | Select-Object Name,AppID | ConvertTo-Json -Depth 3"
+        "[Console]::OutputEncoding = [Text.Encoding]::UTF8; "
+        "Get-StartApps | ForEach-Object { $_.Name, $_.AppID -join [char]9 }"
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        return []
-
-    raw = result.stdout.strip()
-    if not raw:
-        return []
-
     try:
-        data = json.loads(raw)
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=64 * 1024,
+            encoding="utf-8",
+            errors="replace"
+        )
     except Exception:
         return []
 
-    if isinstance(data, dict):
-        data = [data]
-    if not isinstance(data, list):
-        return []
-
+    timer = threading.Timer(START_APPS_TIMEOUT_SECONDS, proc.kill)
+    timer.start()
     apps = []
-    for item in data:
-        name = item.get("Name")
-        app_id = item.get("AppID")
-        if not name or not app_id:
-            continue
-        apps.append({
-            "name": str(name).strip(),
-            "app_id": str(app_id).strip(),
-            "exe_path": None,
-            "version": None,
-            "publisher": None,
-            "install_location": None,
-            "sources": ["startapps"]
-        })
+    try:
+        for line in proc.stdout:
+            name, sep, app_id = line.rstrip("\r\n").partition("\t")
+            if not sep:
+                continue
+            app = _start_app(name, app_id)
+            if app:
+                apps.append(app)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+        timer.cancel()
+
+    if proc.returncode != 0:
+        return []
     return apps
 
 def _merge_apps(primary: dict, incoming: dict) -> dict:
@@ -143,11 +348,66 @@ def _merge_apps(primary: dict, incoming: dict) -> dict:
     for field in ["app_id", "exe_path", "version", "publisher", "install_location"]:
         if not merged.get(field) and incoming.get(field):
             merged[field] = incoming[field]
+    # DisplayIcon paths aren't checked per app, so when hives disagree the one
+    # that exists must win over a stale first match; only conflicts pay for it
+    exe_path = incoming.get("exe_path")
+    if (exe_path and exe_path != merged["exe_path"]
+            and not _exe_exists(merged["exe_path"]) and _exe_exists(exe_path)):
+        merged["exe_path"] = exe_path
     merged_sources = set(merged.get("sources", []))
     merged_sources.update(incoming.get("sources", []))
     merged["sources"] = sorted(merged_sources)
     return merged
 
+def _public_app(app: dict) -> dict:
+    return {k: v for k, v in app.items() if not k.startswith("_")}
+
+SOURCE_REGISTRY = 1
+SOURCE_STARTAPPS = 2
+_SOURCE_BITS = {"registry": SOURCE_REGISTRY, "startapps": SOURCE_STARTAPPS}
+
+# Columnar view of _APP_CACHE["apps"] used for filtering; rebuilt whenever the
+# cached list is replaced.
+_CATALOG = {
+    "apps": None,
+    "keys": [],
+    "src_mask": array("B")
+}
+
+def _source_mask(sources: list[str]) -> int:
+    mask = 0
+    for source in sources:
+        mask |= _SOURCE_BITS.get(source, 0)
+    return mask
+
+SOURCE_ALL = SOURCE_REGISTRY | SOURCE_STARTAPPS
+
+def _catalog_indices(catalog: dict, wanted: int, query: str, limit: int):
+    # Pick a predicate specialized for this request so the per-row check only
+    # does the tests that can actually reject something.
+    keys = catalog["keys"]
+    masks = catalog["src_mask"]
+    count = len(keys)
+    if not wanted:
+        return []
+    if query and wanted == SOURCE_ALL:
+        pred = lambda i: query in keys[i]
+    elif query:
+        pred = lambda i: masks[i] & wanted and query in keys[i]
+    elif wanted == SOURCE_ALL:
+        return range(min(count, limit))
+    else:
+        pred = lambda i: masks[i] & wanted
+    return list(itertools.islice(filter(pred, range(count)), limit))
+
+def _get_catalog(refresh: bool = False) -> dict:
+    apps = _get_all_apps(refresh=refresh)
+    if _CATALOG["apps"] is not apps:
+        _CATALOG["keys"] = [app["_key"] for app in apps]
+        _CATALOG["src_mask"] = array("B", (_source_mask(app.get("sources", [])) for app in apps))
+        _CATALOG["apps"] = apps
+    return _CATALOG
+
 def _get_all_apps(refresh: bool = False) -> list[dict]:
     now = time.time()
     if not refresh and _APP_CACHE["apps"] and (now - _APP_CACHE["timestamp"] < CACHE_TTL_SECONDS):
@@ -165,9 +425,13 @@ def _get_all_apps(refresh: bool = False) -> list[dict]:
         else:
             deduped[key] = app
 
+    for key, app in deduped.items():
+        app["_key"] = key
+
     result = sorted(deduped.values(), key=lambda a: a["name"].lower())
     _APP_CACHE["apps"] = result
     _APP_CACHE["timestamp"] = now
+    _save_disk_cache()
     return result
 
 @server.list_tools()
@@ -232,7 +496,7 @@ async def list_tools() -> list[Tool]:
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     if sys.platform != "win32":
-        return [TextContent(type="text", text=json.dumps({
+        return [TextContent(type="text", text=_dumps({
             "success": False,
             "error": "This tool is only supported on Windows."
         }))]
@@ -244,27 +508,20 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         include_start = arguments.get("include_start_apps", True)
         refresh = bool(arguments.get("refresh", False))
 
-        apps = _get_all_apps(refresh=refresh)
-        filtered = []
-        for app in apps:
-            sources = app.get("sources", [])
-            allowed = False
-            if include_registry and "registry" in sources:
-                allowed = True
-            if include_start and "startapps" in sources:
-                allowed = True
-            if not allowed:
-                continue
-            if query and query not in app["name"].casefold():
-                continue
-            filtered.append(app)
+        wanted = 0
+        if include_registry:
+            wanted |= SOURCE_REGISTRY
+        if include_start:
+            wanted |= SOURCE_STARTAPPS
 
-        filtered = filtered[:max(1, limit)]
-        return [TextContent(type="text", text=json.dumps({
+        catalog = _get_catalog(refresh=refresh)
+        apps = catalog["apps"]
+        filtered = [apps[i] for i in _catalog_indices(catalog, wanted, query, max(1, limit))]
+        return [TextContent(type="text", text=_dumps({
             "success": True,
             "count": len(filtered),
             "generated_at": _now_utc_iso(),
-            "apps": filtered
+            "apps": [_public_app(app) for app in filtered]
         }))]
 
     if name == "launch_app":
@@ -274,7 +531,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         refresh = bool(arguments.get("refresh", False))
 
         if not app_id and not name_value:
-            return [TextContent(type="text", text=json.dumps({
+            return [TextContent(type="text", text=_dumps({
                 "success": False,
                 "error": "Provide name or app_id."
             }))]
@@ -282,12 +539,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         if app_id:
             try:
                 subprocess.Popen(["explorer.exe", f"shell:AppsFolder\\{app_id}"])
-                return [TextContent(type="text", text=json.dumps({
+                return [TextContent(type="text", text=_dumps({
                     "success": True,
                     "launched": {"app_id": app_id, "method": "startapps"}
                 }))]
             except Exception as e:
-                return [TextContent(type="text", text=json.dumps({
+                return [TextContent(type="text", text=_dumps({
                     "success": False,
                     "error": f"Failed to launch AppID: {str(e)}"
                 }))]
@@ -296,12 +553,12 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         name_key = _normalize_name(name_value)
 
         if exact:
-            matches = [a for a in apps if _normalize_name(a["name"]) == name_key]
+            matches = [a for a in apps if a["_key"] == name_key]
         else:
-            matches = [a for a in apps if name_key in _normalize_name(a["name"])]
+            matches = [a for a in apps if name_key in a["_key"]]
 
         if not matches:
-            return [TextContent(type="text", text=json.dumps({
+            return [TextContent(type="text", text=_dumps({
                 "success": False,
                 "error": f"No apps found matching '{name_value}'."
             }))]
@@ -311,7 +568,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
                 {"name": m["name"], "app_id": m.get("app_id"), "exe_path": m.get("exe_path")}
                 for m in matches[:10]
             ]
-            return [TextContent(type="text", text=json.dumps({
+            return [TextContent(type="text", text=_dumps({
                 "success": False,
                 "error": "Multiple matches found. Use a more specific name or app_id.",
                 "matches": options
@@ -321,36 +578,36 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         if match.get("app_id"):
             try:
                 subprocess.Popen(["explorer.exe", f"shell:AppsFolder\\{match['app_id']}"])
-                return [TextContent(type="text", text=json.dumps({
+                return [TextContent(type="text", text=_dumps({
                     "success": True,
                     "launched": {"name": match["name"], "method": "startapps", "app_id": match["app_id"]}
                 }))]
             except Exception as e:
-                return [TextContent(type="text", text=json.dumps({
+                return [TextContent(type="text", text=_dumps({
                     "success": False,
                     "error": f"Failed to launch AppID: {str(e)}"
                 }))]
 
         exe_path = match.get("exe_path")
-        if exe_path and os.path.exists(exe_path):
+        if exe_path and _exe_exists(exe_path):
             try:
                 subprocess.Popen([exe_path], cwd=str(Path(exe_path).parent))
-                return [TextContent(type="text", text=json.dumps({
+                return [TextContent(type="text", text=_dumps({
                     "success": True,
                     "launched": {"name": match["name"], "method": "exe", "exe_path": exe_path}
                 }))]
             except Exception as e:
-                return [TextContent(type="text", text=json.dumps({
+                return [TextContent(type="text", text=_dumps({
                     "success": False,
                     "error": f"Failed to launch exe: {str(e)}"
                 }))]
 
-        return [TextContent(type="text", text=json.dumps({
+        return [TextContent(type="text", text=_dumps({
             "success": False,
             "error": "No launch method available for this app. Try using app_id from list_installed_apps."
         }))]
 
-    return [TextContent(type="text", text=json.dumps({
+    return [TextContent(type="text", text=_dumps({
         "success": False,
         "error": f"Unknown tool: {name}"
     }))]
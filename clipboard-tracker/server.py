@@ -5,15 +5,37 @@ Tracks clipboard changes with context (app, window, browser tab, timestamp)
 """
 
 import asyncio
+import atexit
+import concurrent.futures
+import ctypes
+import hashlib
 import json
+import os
+import re
 import sqlite3
 import sys
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-import pyperclip
 import psutil
+import win32api
+import win32clipboard
+import win32con
 import win32gui
 import win32process
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
@@ -22,28 +44,117 @@ from mcp.types import Tool, TextContent
 DB_PATH = Path.home() / ".julia" / "clipboard_tracker.db"
 DB_PATH.parent.mkdir(exist_ok=True)
 
+# One long-lived connection shared by the monitor and tool handlers
+_CONN = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+_CONN.execute("PRAGMA journal_mode=WAL")
+_CONN.execute("PRAGMA synchronous=NORMAL")
+_CONN.execute("PRAGMA temp_store=MEMORY")
+_CONN.row_factory = sqlite3.Row
+_DB_LOCK = threading.Lock()
+
+# Truncation happens in SQLite so the full content is never decoded into Python
+HISTORY_COLUMNS = """
+    {p}id, substr({p}content, 1, 200) AS snippet, length({p}content) AS full_len,
+    {p}timestamp, {p}app_name, {p}window_title, {p}browser_tab,
+    {p}content_type, {p}content_length
+"""
+
 def init_database():
     """Initialize SQLite database for clipboard history"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS clipboard_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            content TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            app_name TEXT,
-            window_title TEXT,
-            process_name TEXT,
-            browser_url TEXT,
-            browser_tab TEXT,
-            content_type TEXT,
-            content_length INTEGER
+    with _DB_LOCK:
+        _CONN.execute("""
+            CREATE TABLE IF NOT EXISTS clipboard_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                app_name TEXT,
+                window_title TEXT,
+                process_name TEXT,
+                browser_url TEXT,
+                browser_tab TEXT,
+                content_type TEXT,
+                content_length INTEGER
+            )
+        """)
+        columns = {row[1] for row in _CONN.execute("PRAGMA table_info(clipboard_history)")}
+        if 'content_hash' not in columns:
+            _CONN.execute("ALTER TABLE clipboard_history ADD COLUMN content_hash BLOB")
+        # Older rows have NULL hashes, which never conflict
+        _CONN.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_hash ON clipboard_history(content_hash)"
+        )
+        _CONN.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ts ON clipboard_history(timestamp DESC)"
         )
-    """)
+        _CONN.execute(
+            "CREATE INDEX IF NOT EXISTS idx_app ON clipboard_history(app_name)"
+        )
+        init_fts()
+
+# Set by init_fts(); search falls back to LIKE when FTS5 is unavailable
+_FTS_ENABLED = False
+
+def init_fts():
+    """Create the trigram FTS5 index over clipboard content"""
+    global _FTS_ENABLED
     
-    conn.commit()
-    conn.close()
+    exists = _CONN.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clipboard_fts'"
+    ).fetchone()
+    
+    try:
+        # Trigram tokenizer keeps substring semantics of the old LIKE search
+        _CONN.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS clipboard_fts USING fts5(
+                content, content='clipboard_history', content_rowid='id',
+                tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS clipboard_fts_ai AFTER INSERT ON clipboard_history BEGIN
+                INSERT INTO clipboard_fts(rowid, content) VALUES (new.id, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS clipboard_fts_ad AFTER DELETE ON clipboard_history BEGIN
+                INSERT INTO clipboard_fts(clipboard_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS clipboard_fts_au AFTER UPDATE ON clipboard_history BEGIN
+                INSERT INTO clipboard_fts(clipboard_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+                INSERT INTO clipboard_fts(rowid, content) VALUES (new.id, new.content);
+            END;
+        """)
+        if not exists:
+            # Index rows recorded before the FTS table existed
+            _CONN.execute("INSERT INTO clipboard_fts(clipboard_fts) VALUES ('rebuild')")
+        _FTS_ENABLED = True
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 unavailable, using LIKE search: {e}", file=sys.stderr)
+        _FTS_ENABLED = False
+
+BROWSERS = ['chrome', 'firefox', 'edge', 'brave', 'opera']
+BROWSER_PATTERN = re.compile('|'.join(map(re.escape, BROWSERS)))
+
+# pid -> (create_time, app_name, process_name, is_browser), LRU-bounded
+_PROC_CACHE = OrderedDict()
+_PROC_CACHE_SIZE = 256
+
+def get_process_info(pid):
+    """Get (app_name, process_name, is_browser) for a pid, cached per process instance"""
+    process = psutil.Process(pid)
+    # create_time distinguishes a reused pid from the process we cached
+    create_time = process.create_time()
+    
+    cached = _PROC_CACHE.get(pid)
+    if cached and cached[0] == create_time:
+        _PROC_CACHE.move_to_end(pid)
+        return cached[1:]
+    
+    app_name = process.name()
+    process_name = process.exe()
+    is_browser = BROWSER_PATTERN.search(app_name.lower()) is not None
+    _PROC_CACHE[pid] = (create_time, app_name, process_name, is_browser)
+    if len(_PROC_CACHE) > _PROC_CACHE_SIZE:
+        _PROC_CACHE.popitem(last=False)
+    return app_name, process_name, is_browser
 
 def get_active_window_info():
     """Get information about the currently active window"""
@@ -59,18 +170,17 @@ def get_active_window_info():
         
         # Get process info
         try:
-            process = psutil.Process(pid)
-            app_name = process.name()
-            process_name = process.exe()
+            app_name, process_name, is_browser = get_process_info(pid)
         except:
             app_name = "Unknown"
             process_name = "Unknown"
+            is_browser = False
         
         # Check if it's a browser and try to get URL/tab info
         browser_url = None
         browser_tab = None
         
-        if any(browser in app_name.lower() for browser in ['chrome', 'firefox', 'edge', 'brave', 'opera']):
+        if is_browser:
             # Extract URL from window title (works for most browsers)
             # Format is usually: "Page Title - Browser Name"
             if ' - ' in window_title:
@@ -95,66 +205,252 @@ def get_active_window_info():
             'browser_tab': None
         }
 
-def save_clipboard_entry(content, window_info):
-    """Save clipboard entry to database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+# Re-copying known content refreshes the existing row instead of adding a duplicate
+INSERT_SQL = """
+    INSERT INTO clipboard_history 
+    (content, app_name, window_title, process_name, browser_url, browser_tab, content_type, content_length, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(content_hash) DO UPDATE SET
+        timestamp = CURRENT_TIMESTAMP,
+        app_name = excluded.app_name,
+        window_title = excluded.window_title,
+        process_name = excluded.process_name,
+        browser_url = excluded.browser_url,
+        browser_tab = excluded.browser_tab,
+        content_type = excluded.content_type,
+        content_length = excluded.content_length
+"""
+
+def content_fingerprint(content):
+    """128-bit fingerprint of the exact content used for dedup"""
+    data = content.encode('utf-8', 'surrogatepass')
+    if xxhash is not None:
+        return xxhash.xxh3_128(data).digest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+STORED_CONTENT_LENGTH = 5000
+# Larger clipboard payloads are skipped instead of hashed and truncated
+MAX_CONTENT_LENGTH = 1_000_000
+
+def clipboard_entry_row(content, window_info, content_hash):
+    """Build the INSERT parameters for a clipboard entry"""
+    length = len(content)
     
     # Determine content type
     content_type = 'text'
     if content.startswith('http://') or content.startswith('https://'):
         content_type = 'url'
-    elif '\n' in content and len(content) > 100:
+    elif length > 100 and '\n' in content:
         content_type = 'multiline'
     
-    cursor.execute("""
-        INSERT INTO clipboard_history 
-        (content, app_name, window_title, process_name, browser_url, browser_tab, content_type, content_length)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        content[:5000],  # Limit content to 5000 chars
+    return (
+        content if length <= STORED_CONTENT_LENGTH else content[:STORED_CONTENT_LENGTH],
         window_info['app_name'],
         window_info['window_title'],
         window_info['process_name'],
         window_info['browser_url'],
         window_info['browser_tab'],
         content_type,
-        len(content)
-    ))
+        length,
+        content_hash
+    )
+
+def save_clipboard_entries(entries):
+    """Save a batch of (content, window_info, content_hash) entries in one transaction"""
+    rows = [clipboard_entry_row(*entry) for entry in entries]
+    with _DB_LOCK:
+        _CONN.execute("BEGIN")
+        try:
+            _CONN.executemany(INSERT_SQL, rows)
+        except Exception:
+            _CONN.execute("ROLLBACK")
+            raise
+        _CONN.execute("COMMIT")
+
+def save_clipboard_entry(content, window_info):
+    """Save clipboard entry to database"""
+    save_clipboard_entries([(content, window_info, content_fingerprint(content))])
+
+# Group commit: buffered entries are written together every FLUSH_ROWS rows
+# or FLUSH_INTERVAL seconds, whichever comes first
+FLUSH_ROWS = 32
+FLUSH_INTERVAL = 1.0
+_PENDING = []
+_LAST_FLUSH = time.monotonic()
+
+def queue_clipboard_entries(entries):
+    """Buffer entries, flushing once the batch is large or old enough"""
+    _PENDING.extend(entries)
+    if len(_PENDING) >= FLUSH_ROWS or time.monotonic() - _LAST_FLUSH >= FLUSH_INTERVAL:
+        flush_pending()
+
+def flush_pending():
+    """Write all buffered entries in one transaction"""
+    global _LAST_FLUSH
+    _LAST_FLUSH = time.monotonic()
+    if not _PENDING:
+        return
     
-    conn.commit()
-    conn.close()
+    entries = list(_PENDING)
+    _PENDING.clear()
+    try:
+        save_clipboard_entries(entries)
+    except Exception as e:
+        print(f"Error saving clipboard entries: {e}", file=sys.stderr)
 
-async def monitor_clipboard():
-    """Background task to monitor clipboard changes"""
-    last_content = ""
+atexit.register(flush_pending)
+
+WM_CLIPBOARDUPDATE = 0x031D
+
+def read_clipboard_text():
+    """Read unicode text from the clipboard, or None if unavailable"""
+    # Another app may briefly hold the clipboard open right after a change
+    for _ in range(5):
+        try:
+            win32clipboard.OpenClipboard(0)
+            break
+        except Exception:
+            time.sleep(0.02)
+    else:
+        return None
+    
+    try:
+        if not win32clipboard.IsClipboardFormatAvailable(win32con.CF_UNICODETEXT):
+            return None
+        return win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
+    except Exception:
+        return None
+    finally:
+        win32clipboard.CloseClipboard()
+
+def run_clipboard_listener(on_change, ready):
+    """Pump WM_CLIPBOARDUPDATE messages for a hidden window (blocks forever)"""
+    try:
+        def wndproc(hwnd, msg, wparam, lparam):
+            if msg == WM_CLIPBOARDUPDATE:
+                on_change()
+                return 0
+            return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+        
+        wc = win32gui.WNDCLASS()
+        wc.lpfnWndProc = wndproc
+        wc.lpszClassName = "ClipboardTrackerListener"
+        wc.hInstance = win32api.GetModuleHandle(None)
+        win32gui.RegisterClass(wc)
+        
+        # Message-only window: never shown, only receives clipboard notifications
+        hwnd = win32gui.CreateWindow(
+            wc.lpszClassName, "", 0, 0, 0, 0, 0,
+            win32con.HWND_MESSAGE, 0, wc.hInstance, None
+        )
+        if not ctypes.windll.user32.AddClipboardFormatListener(hwnd):
+            raise ctypes.WinError()
+    except Exception as e:
+        ready.set_exception(e)
+        return
+    
+    ready.set_result(True)
+    win32gui.PumpMessages()
+
+async def start_clipboard_listener(queue):
+    """Start the event-driven listener thread; returns False if unavailable"""
+    loop = asyncio.get_running_loop()
+    ready = concurrent.futures.Future()
+    
+    def on_change():
+        content = read_clipboard_text()
+        if content:
+            loop.call_soon_threadsafe(queue.put_nowait, (content, get_active_window_info()))
+    
+    threading.Thread(
+        target=run_clipboard_listener, args=(on_change, ready), daemon=True
+    ).start()
+    
+    try:
+        await asyncio.wrap_future(ready)
+        return True
+    except Exception as e:
+        print(f"Clipboard listener unavailable, falling back to polling: {e}", file=sys.stderr)
+        return False
+
+async def poll_clipboard(queue):
+    """Fallback: poll the clipboard every 500ms"""
+    last_sequence = None
     
     while True:
         try:
-            current_content = pyperclip.paste()
+            # The sequence number changes on every clipboard write, so idle
+            # polls never have to open the clipboard
+            sequence = ctypes.windll.user32.GetClipboardSequenceNumber()
             
-            # Check if clipboard content changed
-            if current_content and current_content != last_content:
-                # Get active window info
-                window_info = get_active_window_info()
-                
-                # Save to database
-                save_clipboard_entry(current_content, window_info)
-                
-                print(
-                    f"[Clipboard] Copied from {window_info['app_name']}: {current_content[:50]}...",
-                    file=sys.stderr
-                )
-                
-                last_content = current_content
+            if sequence != last_sequence:
+                last_sequence = sequence
+                current_content = read_clipboard_text()
+                if current_content:
+                    queue.put_nowait((current_content, get_active_window_info()))
             
             # Check every 500ms
             await asyncio.sleep(0.5)
             
         except Exception as e:
-            print(f"Error monitoring clipboard: {e}", file=sys.stderr)
+            print(f"Error polling clipboard: {e}", file=sys.stderr)
             await asyncio.sleep(1)
 
+async def monitor_clipboard():
+    """Background task to record clipboard changes"""
+    queue = asyncio.Queue()
+    if not await start_clipboard_listener(queue):
+        asyncio.create_task(poll_clipboard(queue))
+    
+    last_hash = None
+    
+    while True:
+        try:
+            # Wake up to flush a partial batch once it has waited long enough
+            timeout = FLUSH_INTERVAL if _PENDING else None
+            batch = [await asyncio.wait_for(queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            flush_pending()
+            continue
+        
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        
+        entries = []
+        for content, window_info in batch:
+            if len(content) > MAX_CONTENT_LENGTH:
+                print(
+                    f"[Clipboard] Skipped {len(content)}-char copy from {window_info['app_name']} (too large)",
+                    file=sys.stderr
+                )
+                continue
+            
+            # Check if clipboard content changed
+            content_hash = content_fingerprint(content)
+            if content_hash == last_hash:
+                continue
+            entries.append((content, window_info, content_hash))
+            last_hash = content_hash
+            
+            print(
+                f"[Clipboard] Copied from {window_info['app_name']}: {content[:50]}...",
+                file=sys.stderr
+            )
+        
+        if entries:
+            queue_clipboard_entries(entries)
+
+# Compact output for MCP clients; set CLIPBOARD_TRACKER_PRETTY_JSON=1 when debugging
+_PRETTY_JSON = os.environ.get('CLIPBOARD_TRACKER_PRETTY_JSON') == '1'
+
+def _dumps(payload):
+    """Serialize a tool response"""
+    if _PRETTY_JSON:
+        return json.dumps(payload, indent=2)
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload)
+
 # MCP Server
 app = Server("clipboard-tracker")
 
@@ -229,15 +525,16 @@ async def list_tools() -> list[Tool]:
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls"""
     
+    # Make buffered copies visible to queries
+    if name in ("get_clipboard_history", "search_clipboard", "get_clipboard_stats"):
+        flush_pending()
+    
     if name == "get_clipboard_history":
         limit = arguments.get("limit", 10)
         app_filter = arguments.get("app_filter")
         content_type = arguments.get("content_type")
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM clipboard_history WHERE 1=1"
+        query = f"SELECT {HISTORY_COLUMNS.format(p='')} FROM clipboard_history WHERE 1=1"
         params = []
         
         if app_filter:
@@ -251,128 +548,128 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with _DB_LOCK:
+            rows = _CONN.execute(query, params).fetchall()
         
         items = []
         for row in rows:
             items.append({
-                'id': row[0],
-                'content': row[1][:200] + ('...' if len(row[1]) > 200 else ''),
-                'timestamp': row[2],
-                'app': row[3],
-                'window': row[4],
-                'browser_tab': row[7] if row[7] else None,
-                'type': row[8],
-                'length': row[9]
+                'id': row['id'],
+                'content': row['snippet'] + ('...' if row['full_len'] > 200 else ''),
+                'timestamp': row['timestamp'],
+                'app': row['app_name'],
+                'window': row['window_title'],
+                'browser_tab': row['browser_tab'] if row['browser_tab'] else None,
+                'type': row['content_type'],
+                'length': row['content_length']
             })
         
         return [TextContent(
             type="text",
-            text=json.dumps({
+            text=_dumps({
                 'success': True,
                 'items': items,
                 'count': len(items)
-            }, indent=2)
+            })
         )]
     
     elif name == "search_clipboard":
         query = arguments.get("query", "")
         limit = arguments.get("limit", 10)
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM clipboard_history 
-            WHERE content LIKE ? 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (f"%{query}%", limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with _DB_LOCK:
+            # Trigram MATCH needs at least 3 characters
+            if _FTS_ENABLED and len(query) >= 3:
+                phrase = '"' + query.replace('"', '""') + '"'
+                rows = _CONN.execute(f"""
+                    SELECT {HISTORY_COLUMNS.format(p='h.')} FROM clipboard_fts f
+                    JOIN clipboard_history h ON h.id = f.rowid
+                    WHERE clipboard_fts MATCH ? 
+                    ORDER BY h.timestamp DESC 
+                    LIMIT ?
+                """, (phrase, limit)).fetchall()
+            else:
+                rows = _CONN.execute(f"""
+                    SELECT {HISTORY_COLUMNS.format(p='')} FROM clipboard_history 
+                    WHERE content LIKE ? 
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                """, (f"%{query}%", limit)).fetchall()
         
         items = []
         for row in rows:
             items.append({
-                'id': row[0],
-                'content': row[1][:200] + ('...' if len(row[1]) > 200 else ''),
-                'timestamp': row[2],
-                'app': row[3],
-                'window': row[4],
-                'browser_tab': row[7] if row[7] else None
+                'id': row['id'],
+                'content': row['snippet'] + ('...' if row['full_len'] > 200 else ''),
+                'timestamp': row['timestamp'],
+                'app': row['app_name'],
+                'window': row['window_title'],
+                'browser_tab': row['browser_tab'] if row['browser_tab'] else None
             })
         
         return [TextContent(
             type="text",
-            text=json.dumps({
+            text=_dumps({
                 'success': True,
                 'query': query,
                 'items': items,
                 'count': len(items)
-            }, indent=2)
+            })
         )]
     
     elif name == "get_clipboard_stats":
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Total entries
-        cursor.execute("SELECT COUNT(*) FROM clipboard_history")
-        total = cursor.fetchone()[0]
-        
-        # Most used apps
-        cursor.execute("""
-            SELECT app_name, COUNT(*) as count 
-            FROM clipboard_history 
-            GROUP BY app_name 
-            ORDER BY count DESC 
-            LIMIT 5
-        """)
-        top_apps = [{'app': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        
-        # Content types
-        cursor.execute("""
-            SELECT content_type, COUNT(*) as count 
-            FROM clipboard_history 
-            GROUP BY content_type
-        """)
-        content_types = [{'type': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        
-        conn.close()
+        with _DB_LOCK:
+            cursor = _CONN.cursor()
+            
+            # Total entries
+            cursor.execute("SELECT COUNT(*) FROM clipboard_history")
+            total = cursor.fetchone()[0]
+            
+            # Most used apps
+            cursor.execute("""
+                SELECT app_name, COUNT(*) as count 
+                FROM clipboard_history 
+                GROUP BY app_name 
+                ORDER BY count DESC 
+                LIMIT 5
+            """)
+            top_apps = [{'app': row[0], 'count': row[1]} for row in cursor.fetchall()]
+            
+            # Content types
+            cursor.execute("""
+                SELECT content_type, COUNT(*) as count 
+                FROM clipboard_history 
+                GROUP BY content_type
+            """)
+            content_types = [{'type': row[0], 'count': row[1]} for row in cursor.fetchall()]
         
         return [TextContent(
             type="text",
-            text=json.dumps({
+            text=_dumps({
                 'success': True,
                 'total_entries': total,
                 'top_apps': top_apps,
                 'content_types': content_types
-            }, indent=2)
+            })
         )]
     
     elif name == "clear_clipboard_history":
         if not arguments.get("confirm"):
             return [TextContent(
                 type="text",
-                text=json.dumps({
+                text=_dumps({
                     'success': False,
                     'error': 'Must confirm deletion with confirm=true'
                 })
             )]
         
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM clipboard_history")
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        _PENDING.clear()
+        with _DB_LOCK:
+            deleted = _CONN.execute("DELETE FROM clipboard_history").rowcount
         
         return [TextContent(
             type="text",
-            text=json.dumps({
+            text=_dumps({
                 'success': True,
                 'deleted': deleted,
                 'message': f'Deleted {deleted} clipboard entries'
@@ -381,7 +678,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     
     return [TextContent(
         type="text",
-        text=json.dumps({'error': f'Unknown tool: {name}'})
+        text=_dumps({'error': f'Unknown tool: {name}'})
     )]
 
 async def main():
@@ -10,10 +10,107 @@ Transport: stdio (JSONRPC 2.0)
 
 import sys
 import json
+import asyncio
 import subprocess
 import os
+import re
+import shlex
+import shutil
+import signal
+import functools
+import ctypes
 import time
 import threading
+import contextvars
+
+try:
+    import orjson  # Optional: faster encoding, falls back to stdlib json
+except ImportError:
+    orjson = None
+
+def node_search_roots():
+    """Directories whose contents determine the Node.js PATH entries."""
+    home = os.path.expanduser("~")
+    return {
+        "home": home,
+        "program_files": os.environ.get("ProgramFiles", "C:\\Program Files"),
+        "program_files_x86": os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)"),
+        "appdata": os.environ.get("APPDATA", os.path.join(home, "AppData", "Roaming")),
+        "localappdata": os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local")),
+    }
+
+def node_candidates(roots):
+    """Common Node.js install locations on Windows."""
+    return [
+        os.path.join(roots["program_files"], "nodejs"),
+        os.path.join(roots["program_files_x86"], "nodejs"),
+        os.path.join(roots["appdata"], "npm"),
+        os.path.join(roots["localappdata"], "fnm"),
+        os.path.join(roots["home"], ".nvm"),
+        os.path.join(roots["home"], ".fnm"),
+    ]
+
+def find_node_paths(roots):
+    """Scan common Node.js install locations on Windows."""
+    extra_paths = []
+    
+    # Also check for fnm/nvm managed versions
+    fnm_dir = os.path.join(roots["localappdata"], "fnm_multishells")
+    # DirEntry caches the file type, so is_dir() needs no extra stat per shell
+    try:
+        with os.scandir(fnm_dir) as it:
+            extra_paths.extend(entry.path for entry in it if entry.is_dir())
+    except OSError:
+        pass
+
+    for candidate in node_candidates(roots):
+        if os.path.isdir(candidate):
+            extra_paths.append(candidate)
+    
+    return extra_paths
+
+PATH_CACHE_FILE = os.path.join(
+    os.environ.get("LOCALAPPDATA", os.path.join(os.path.expanduser("~"), "AppData", "Local")),
+    "node-runner", "path.cache"
+)
+
+def path_cache_key(roots):
+    """Existence and mtime of each candidate plus the fnm shells directory.
+    
+    One stat per location replaces the listdir + per-entry isdir walk of
+    fnm_multishells, which grows with every fnm shell ever opened.
+    """
+    dirs = node_candidates(roots) + [os.path.join(roots["localappdata"], "fnm_multishells")]
+    key = []
+    for d in dirs:
+        try:
+            key.append([d, os.stat(d).st_mtime_ns])
+        except OSError:
+            key.append([d, None])
+    return key
+
+def cached_node_paths():
+    """find_node_paths(), reusing the on-disk result while the key matches."""
+    roots = node_search_roots()
+    key = path_cache_key(roots)
+    try:
+        with open(PATH_CACHE_FILE, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return cached["paths"]
+    except Exception:
+        pass
+    
+    extra_paths = find_node_paths(roots)
+    try:
+        os.makedirs(os.path.dirname(PATH_CACHE_FILE), exist_ok=True)
+        tmp = f"{PATH_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "paths": extra_paths}, f)
+        os.replace(tmp, PATH_CACHE_FILE)
+    except Exception:
+        pass
+    return extra_paths
 
 # Build an environment that includes common Node.js paths
 def get_node_env():
@@ -23,35 +120,7 @@ def get_node_env():
     env["CI"] = "true"
     env["FORCE_COLOR"] = "0"
     
-    # Common Node.js install locations on Windows
-    extra_paths = []
-    home = os.path.expanduser("~")
-    program_files = os.environ.get("ProgramFiles", "C:\\Program Files")
-    program_files_x86 = os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")
-    appdata = os.environ.get("APPDATA", os.path.join(home, "AppData", "Roaming"))
-    localappdata = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
-    
-    node_candidates = [
-        os.path.join(program_files, "nodejs"),
-        os.path.join(program_files_x86, "nodejs"),
-        os.path.join(appdata, "npm"),
-        os.path.join(localappdata, "fnm"),
-        os.path.join(home, ".nvm"),
-        os.path.join(home, ".fnm"),
-    ]
-    
-    # Also check for fnm/nvm managed versions
-    fnm_dir = os.path.join(localappdata, "fnm_multishells")
-    if os.path.isdir(fnm_dir):
-        for d in os.listdir(fnm_dir):
-            full = os.path.join(fnm_dir, d)
-            if os.path.isdir(full):
-                extra_paths.append(full)
-    
-    for candidate in node_candidates:
-        if os.path.isdir(candidate):
-            extra_paths.append(candidate)
-    
+    extra_paths = cached_node_paths()
     if extra_paths:
         env["PATH"] = ";".join(extra_paths) + ";" + env.get("PATH", "")
     
@@ -59,11 +128,36 @@ def get_node_env():
 
 NODE_ENV = get_node_env()
 
+# Tool calls run as tasks on one event loop so a long build doesn't block
+# ping/list; in-flight tasks are kept here until they finish
+PENDING = set()
+
+def encode_message(message):
+    """Encode a JSONRPC message as one UTF-8 line."""
+    if orjson is not None:
+        return orjson.dumps(message) + b"\n"
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+def encode_text(value, indent=False):
+    """Encode a tool result for a text content block."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    return json.dumps(value, indent=2 if indent else None)
+
+# While a JSONRPC batch is being dispatched, responses are collected here
+# and written as one array instead of one line each
+_RESPONSE_SINK = contextvars.ContextVar("response_sink", default=None)
+
 def send_response(response):
     """Send a JSONRPC response to stdout."""
-    msg = json.dumps(response)
-    sys.stdout.write(msg + "\n")
-    sys.stdout.flush()
+    sink = _RESPONSE_SINK.get()
+    if sink is not None:
+        sink.append(response)
+        return
+    
+    # Only the event loop thread writes, so no lock is needed
+    sys.stdout.buffer.write(encode_message(response))
+    sys.stdout.buffer.flush()
 
 def send_error(id, code, message):
     """Send a JSONRPC error response."""
@@ -175,7 +269,104 @@ TOOLS = [
 
 # ─── Tool Handlers ────────────────────────────────────────────
 
-def run_command(command, cwd, timeout=60):
+# Anything a shell would interpret; such commands still go through the shell
+SHELL_SYNTAX = re.compile(r"[&|<>^%$;`()*?~\n]")
+
+@functools.lru_cache(maxsize=128)
+def resolve_executable(name):
+    """Locate a bare program name on the Node-aware PATH."""
+    return shutil.which(name, path=NODE_ENV.get("PATH"))
+
+# Warm the cache for the tools this server exists to run
+RESOLVED = {name: resolve_executable(name) for name in ("node", "npm", "npx", "yarn", "pnpm")}
+
+def build_argv(command):
+    """Split a simple command into argv with a resolved executable.
+    
+    Returns None when the command needs a shell (operators, expansions,
+    builtins, relative paths) so the caller can fall back to shell=True.
+    """
+    if SHELL_SYNTAX.search(command):
+        return None
+    try:
+        if os.name == "nt":
+            argv = [
+                t[1:-1] if len(t) >= 2 and t[0] == t[-1] and t[0] in "\"'" else t
+                for t in shlex.split(command, posix=False)
+            ]
+        else:
+            argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or os.sep in argv[0] or "/" in argv[0]:
+        return None
+    
+    executable = resolve_executable(argv[0])
+    if not executable:
+        return None
+    return [executable] + argv[1:]
+
+def popen_args(command):
+    """(args, shell) for subprocess: direct exec when possible."""
+    argv = build_argv(command)
+    if argv is None:
+        return command, True
+    return argv, False
+
+STDOUT_TAIL_BYTES = 5000
+STDERR_TAIL_BYTES = 2000
+PIPE_READ_SIZE = 65536
+
+# Larger kernel pipe buffers mean fewer reader wakeups and a child that
+# rarely blocks on write (pipesize is Python 3.10+, Linux only)
+PIPE_OPTIONS = {}
+if sys.version_info >= (3, 10):
+    PIPE_OPTIONS["pipesize"] = 1024 * 1024
+
+async def read_tail(stream, limit, state):
+    """Drain a stream to EOF, keeping only the last `limit` bytes in state["tail"]."""
+    tail = state["tail"]
+    while True:
+        chunk = await stream.read(PIPE_READ_SIZE)
+        if not chunk:
+            break
+        state["total"] += len(chunk)
+        tail += chunk
+        if len(tail) > limit:
+            del tail[:-limit]
+
+def decode_tail(state):
+    return state["tail"].decode("utf-8", "replace").replace("\r\n", "\n")
+
+async def spawn_process(command, cwd, **kwargs):
+    """Start a command directly when possible, through the shell otherwise."""
+    args, shell = popen_args(command)
+    if shell:
+        return await asyncio.create_subprocess_shell(args, cwd=cwd, env=NODE_ENV, **kwargs)
+    return await asyncio.create_subprocess_exec(*args, cwd=cwd, env=NODE_ENV, **kwargs)
+
+async def kill_tree(proc):
+    """Kill a process and all of its children (not just the shell)."""
+    try:
+        if os.name == "nt":
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill", "/T", "/F", "/PID", str(proc.pid),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            await killer.wait()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        pass
+    # Fall back to the direct child if the tree kill failed
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+async def run_command(command, cwd, timeout=60):
     """Execute a command and return output."""
     timeout = min(max(timeout, 5), 300)  # Clamp 5-300s
     
@@ -192,34 +383,59 @@ def run_command(command, cwd, timeout=60):
     
     start = time.time()
     try:
-        result = subprocess.run(
+        # stdin is our JSONRPC stream; never let the child read from it
+        proc = await spawn_process(
             command,
-            shell=True,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            env=NODE_ENV
+            cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            # Own process group so a timeout can kill the whole tree
+            start_new_session=(os.name != "nt"),
+            **PIPE_OPTIONS
+        )
+        
+        # Only the tail of each stream is kept, so chatty builds use
+        # constant memory instead of buffering their whole output
+        out = {"tail": bytearray(), "total": 0}
+        err = {"tail": bytearray(), "total": 0}
+        readers = asyncio.gather(
+            read_tail(proc.stdout, STDOUT_TAIL_BYTES, out),
+            read_tail(proc.stderr, STDERR_TAIL_BYTES, err),
         )
+        
+        timed_out = False
+        try:
+            await asyncio.wait_for(proc.wait(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            await kill_tree(proc)
+            await proc.wait()
+        
+        # Detached grandchildren can still hold the pipes open
+        try:
+            await asyncio.wait_for(readers, 2)
+        except asyncio.TimeoutError:
+            pass
         duration = int((time.time() - start) * 1000)
         
+        if timed_out:
+            return {
+                "success": False,
+                "error": f"Command timed out after {timeout}s",
+                "stdout": decode_tail(out),
+                "stderr": decode_tail(err),
+                "exit_code": -1,
+                "duration_ms": duration
+            }
+        
         return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout[-5000:] if len(result.stdout) > 5000 else result.stdout,
-            "stderr": result.stderr[-2000:] if len(result.stderr) > 2000 else result.stderr,
-            "exit_code": result.returncode,
+            "success": proc.returncode == 0,
+            "stdout": decode_tail(out),
+            "stderr": decode_tail(err),
+            "exit_code": proc.returncode,
             "duration_ms": duration,
-            "truncated": len(result.stdout) > 5000
-        }
-    except subprocess.TimeoutExpired:
-        duration = int((time.time() - start) * 1000)
-        return {
-            "success": False,
-            "error": f"Command timed out after {timeout}s",
-            "stdout": "",
-            "stderr": "",
-            "exit_code": -1,
-            "duration_ms": duration
+            "truncated": out["total"] > STDOUT_TAIL_BYTES
         }
     except Exception as e:
         duration = int((time.time() - start) * 1000)
@@ -232,13 +448,13 @@ def run_command(command, cwd, timeout=60):
             "duration_ms": duration
         }
 
-def handle_run_node_command(args):
+async def handle_run_node_command(args):
     command = args.get("command", "")
     cwd = args.get("cwd", ".")
     timeout = args.get("timeout", 60)
-    return run_command(command, cwd, timeout)
+    return await run_command(command, cwd, timeout)
 
-def handle_npm_install(args):
+async def handle_npm_install(args):
     cwd = args.get("cwd", ".")
     packages = args.get("packages", "")
     dev = args.get("dev", False)
@@ -249,36 +465,156 @@ def handle_npm_install(args):
     if dev:
         cmd += " --save-dev"
     
-    return run_command(cmd, cwd, timeout=120)
+    return await run_command(cmd, cwd, timeout=120)
 
-def handle_vite_build(args):
+async def handle_vite_build(args):
     cwd = args.get("cwd", ".")
-    return run_command("npx vite build", cwd, timeout=120)
+    return await run_command("npx vite build", cwd, timeout=120)
 
-def handle_npm_test(args):
+async def handle_npm_test(args):
     cwd = args.get("cwd", ".")
     test_command = args.get("test_command", "npm test")
-    return run_command(test_command, cwd, timeout=120)
+    return await run_command(test_command, cwd, timeout=120)
 
-def handle_check_node_version(args):
-    versions = {}
-    for cmd_name, cmd in [("node", "node --version"), ("npm", "npm --version"), ("npx", "npx --version")]:
+VERSION_CACHE_TTL = 300
+_VERSION_CACHE = {}
+_VERSION_CACHE_TS = 0.0
+# Concurrent version checks share one probe instead of each starting their own
+_VERSION_TASK = None
+
+async def probe_version(cmd_name):
+    """Run `<tool> --version`; return the version string or None."""
+    proc = None
+    try:
+        proc = await spawn_process(
+            f"{cmd_name} --version",
+            None,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        stdout, _ = await asyncio.wait_for(proc.communicate(), 10)
+        return stdout.decode("utf-8", "replace").strip() if proc.returncode == 0 else None
+    except:
+        if proc is not None and proc.returncode is None:
+            proc.kill()
+        return None
+
+# ─── Version fast paths: read from disk instead of starting Node ───
+
+PACKAGE_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]+)"')
+PACKAGE_VERSION_RE = re.compile(r'"version"\s*:\s*"([^"]+)"')
+NODE_VERSION_H_RE = re.compile(r"#define NODE_(MAJOR|MINOR|PATCH)_VERSION (\d+)")
+
+# npx ships inside the npm package
+VERSION_PACKAGES = {"npm": "npm", "npx": "npm", "yarn": "yarn", "pnpm": "pnpm"}
+
+def read_package_version(executable, package):
+    """Version from the package.json of the package providing `executable`."""
+    real = os.path.realpath(executable)
+    candidates = [
+        # Windows: npm.cmd/npx.cmd shims sit next to node_modules
+        os.path.join(os.path.dirname(executable), "node_modules", package, "package.json"),
+        # POSIX: bin symlinks resolve into <package>/bin/<script>
+        os.path.join(os.path.dirname(os.path.dirname(real)), "package.json"),
+    ]
+    for candidate in candidates:
         try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10, env=NODE_ENV)
-            versions[cmd_name] = result.stdout.strip() if result.returncode == 0 else "not found"
-        except:
-            versions[cmd_name] = "not found"
+            with open(candidate, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            continue
+        name = PACKAGE_NAME_RE.search(text)
+        version = PACKAGE_VERSION_RE.search(text)
+        if name and version and name.group(1) == package:
+            return version.group(1)
+    return None
+
+def read_exe_file_version(path):
+    """FileVersion resource of a Windows executable as vX.Y.Z."""
+    version = ctypes.windll.version
+    size = version.GetFileVersionInfoSizeW(path, None)
+    if not size:
+        return None
+    buf = ctypes.create_string_buffer(size)
+    if not version.GetFileVersionInfoW(path, 0, size, buf):
+        return None
+    info = ctypes.c_void_p()
+    length = ctypes.c_uint()
+    if not version.VerQueryValueW(buf, "\\", ctypes.byref(info), ctypes.byref(length)):
+        return None
+    # VS_FIXEDFILEINFO: dwFileVersionMS/LS are the 3rd and 4th DWORDs
+    fixed = ctypes.cast(info, ctypes.POINTER(ctypes.c_uint32 * 4)).contents
+    ms, ls = fixed[2], fixed[3]
+    return f"v{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}"
+
+def read_node_version(executable):
+    """Node version from node.exe's version resource or node_version.h."""
+    if os.name == "nt":
+        return read_exe_file_version(executable)
+    prefix = os.path.dirname(os.path.dirname(os.path.realpath(executable)))
+    try:
+        with open(os.path.join(prefix, "include", "node", "node_version.h"), "r", encoding="utf-8") as f:
+            parts = dict(NODE_VERSION_H_RE.findall(f.read()))
+        return f"v{parts['MAJOR']}.{parts['MINOR']}.{parts['PATCH']}"
+    except (OSError, KeyError):
+        return None
+
+def fast_version(cmd_name):
+    """Version read from disk, or None when the layout isn't recognized."""
+    executable = resolve_executable(cmd_name)
+    if not executable:
+        return None
+    try:
+        if cmd_name == "node":
+            return read_node_version(executable)
+        return read_package_version(executable, VERSION_PACKAGES[cmd_name])
+    except Exception:
+        return None
+
+async def find_version(cmd_name):
+    return fast_version(cmd_name) or await probe_version(cmd_name)
+
+async def handle_check_node_version(args):
+    return {"versions": dict(await get_versions())}
+
+async def get_versions():
+    """Return cached tool versions, probing on a miss."""
+    global _VERSION_TASK
+    
+    if _VERSION_CACHE and time.time() - _VERSION_CACHE_TS < VERSION_CACHE_TTL:
+        return _VERSION_CACHE
+    
+    if _VERSION_TASK is None:
+        _VERSION_TASK = asyncio.ensure_future(probe_versions())
+    task = _VERSION_TASK
+    try:
+        # Shielded so one cancelled caller doesn't abort the shared probe
+        return await asyncio.shield(task)
+    finally:
+        if task.done() and _VERSION_TASK is task:
+            _VERSION_TASK = None
+
+async def probe_versions():
+    global _VERSION_CACHE, _VERSION_CACHE_TS
+    
+    # Subprocess probes are only needed when the fast path misses; they are
+    # process-startup bound, so run them all at once
+    names = ["node", "npm", "npx", "yarn", "pnpm"]
+    found = dict(zip(names, await asyncio.gather(*map(find_version, names))))
+    
+    versions = {}
+    for cmd_name in ["node", "npm", "npx"]:
+        versions[cmd_name] = found[cmd_name] or "not found"
     
-    # Optional: check yarn and pnpm
+    # Optional: yarn and pnpm are only listed when installed
     for cmd_name in ["yarn", "pnpm"]:
-        try:
-            result = subprocess.run(f"{cmd_name} --version", shell=True, capture_output=True, text=True, timeout=10, env=NODE_ENV)
-            if result.returncode == 0:
-                versions[cmd_name] = result.stdout.strip()
-        except:
-            pass
+        if found[cmd_name]:
+            versions[cmd_name] = found[cmd_name]
     
-    return {"versions": versions}
+    _VERSION_CACHE = versions
+    _VERSION_CACHE_TS = time.time()
+    return versions
 
 TOOL_HANDLERS = {
     "run_node_command": handle_run_node_command,
@@ -290,6 +626,20 @@ TOOL_HANDLERS = {
 
 # ─── JSONRPC Handler ──────────────────────────────────────────
 
+async def run_tool(id, handler, tool_args):
+    """Run a tool handler (as an event loop task) and send its result."""
+    try:
+        result = await handler(tool_args)
+        send_result(id, {
+            "content": [{"type": "text", "text": encode_text(result, indent=True)}],
+            "isError": not result.get("success", True) if isinstance(result, dict) else False
+        })
+    except Exception as e:
+        send_result(id, {
+            "content": [{"type": "text", "text": encode_text({"error": str(e)})}],
+            "isError": True
+        })
+
 def handle_request(request):
     """Handle a single JSONRPC request."""
     method = request.get("method", "")
@@ -321,22 +671,16 @@ def handle_request(request):
         handler = TOOL_HANDLERS.get(tool_name)
         if not handler:
             send_result(id, {
-                "content": [{"type": "text", "text": json.dumps({"error": f"Unknown tool: {tool_name}"})}],
+                "content": [{"type": "text", "text": encode_text({"error": f"Unknown tool: {tool_name}"})}],
                 "isError": True
             })
             return
         
-        try:
-            result = handler(tool_args)
-            send_result(id, {
-                "content": [{"type": "text", "text": json.dumps(result, indent=2)}],
-                "isError": not result.get("success", True) if isinstance(result, dict) else False
-            })
-        except Exception as e:
-            send_result(id, {
-                "content": [{"type": "text", "text": json.dumps({"error": str(e)})}],
-                "isError": True
-            })
+        # Tasks copy the current context, so the batch sink (if any) comes along
+        task = asyncio.ensure_future(run_tool(id, handler, tool_args))
+        PENDING.add(task)
+        task.add_done_callback(PENDING.discard)
+        return task
     
     elif method == "ping":
         send_result(id, {})
@@ -347,25 +691,129 @@ def handle_request(request):
 
 # ─── Main Loop ────────────────────────────────────────────────
 
-def main():
+READ_CHUNK_SIZE = 65536
+
+def handle_batch(requests):
+    """Handle a JSONRPC 2.0 batch, replying with a single array."""
+    if not requests:
+        send_error(None, -32600, "Invalid Request: empty batch")
+        return
+    
+    responses = []
+    futures = []
+    token = _RESPONSE_SINK.set(responses)
+    try:
+        for request in requests:
+            if not isinstance(request, dict):
+                send_error(None, -32600, "Invalid Request")
+                continue
+            future = handle_request(request)
+            if future is not None:
+                futures.append(future)
+    finally:
+        _RESPONSE_SINK.reset(token)
+    
+    def flush():
+        # A batch of only notifications gets no reply
+        if responses:
+            send_response(responses)
+    
+    if not futures:
+        flush()
+        return
+    
+    # Reply once the last tool call of the batch finishes, without
+    # blocking the stdin loop while they run
+    remaining = [len(futures)]
+    
+    def on_done(_):
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            flush()
+    
+    for future in futures:
+        future.add_done_callback(on_done)
+
+def process_line(line):
+    """Decode and handle one newline-delimited JSONRPC message."""
+    line = line.strip()
+    if not line:
+        return
+    
+    try:
+        request = json.loads(line)
+        if isinstance(request, list):
+            handle_batch(request)
+        else:
+            handle_request(request)
+    except json.JSONDecodeError as e:
+        sys.stderr.write(f"[node-runner] Invalid JSON: {e}\n")
+        sys.stderr.flush()
+    except Exception as e:
+        sys.stderr.write(f"[node-runner] Error: {e}\n")
+        sys.stderr.flush()
+
+def feed_stdin(loop, reader):
+    """Blocking stdin reader for when the pipe can't be watched by the loop."""
+    stdin = sys.stdin.buffer
+    try:
+        while True:
+            chunk = stdin.read1(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            loop.call_soon_threadsafe(reader.feed_data, chunk)
+    finally:
+        loop.call_soon_threadsafe(reader.feed_eof)
+
+async def open_stdin():
+    """Wrap stdin in a StreamReader."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    feeder = threading.Thread(target=feed_stdin, args=(loop, reader), daemon=True)
+    # The Windows proactor can't read an inherited (non-overlapped) stdin
+    # handle, and no loop can watch a regular file; both use a thread
+    if os.name == "nt":
+        feeder.start()
+    else:
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        except (ValueError, OSError):
+            feeder.start()
+    return reader
+
+async def amain():
     """Read JSONRPC messages from stdin, process them."""
     sys.stderr.write("[node-runner] MCP Server started\n")
     sys.stderr.flush()
     
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+    # Read stdin in large chunks and split frames ourselves instead of one
+    # readline() per message; json.loads accepts the raw UTF-8 bytes.
+    reader = await open_stdin()
+    buffer = bytearray()
+    while True:
+        chunk = await reader.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
         
-        try:
-            request = json.loads(line)
-            handle_request(request)
-        except json.JSONDecodeError as e:
-            sys.stderr.write(f"[node-runner] Invalid JSON: {e}\n")
-            sys.stderr.flush()
-        except Exception as e:
-            sys.stderr.write(f"[node-runner] Error: {e}\n")
-            sys.stderr.flush()
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            process_line(bytes(buffer[start:end]))
+            start = end + 1
+        del buffer[:start]
+    
+    # Final message without a trailing newline
+    process_line(bytes(buffer))
+    
+    # Let in-flight tool calls finish and respond before exiting
+    while PENDING:
+        await asyncio.wait(list(PENDING))
+
+def main():
+    asyncio.run(amain())
 
 if __name__ == "__main__":
     main()
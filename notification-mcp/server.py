@@ -5,11 +5,17 @@ Simple MCP tools for sending local system notifications.
 """
 
 import asyncio
+import atexit
 import json
+import queue
+import sys
+import threading
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+import msgpack
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
@@ -18,9 +24,49 @@ server = Server("notification-mcp")
 
 APP_NAME = "MCP Notification"
 DATA_DIR = Path.home() / ".notification-mcp"
-LOG_FILE = DATA_DIR / "events.jsonl"
+LOG_FILE = DATA_DIR / "events.log"
+# Older versions logged JSON lines here; exports carry that history forward
+LEGACY_LOG_FILE = DATA_DIR / "events.jsonl"
+EXPORT_FILE = DATA_DIR / "events.export.jsonl"
 DATA_DIR.mkdir(exist_ok=True)
 
+# The log is a sequence of msgpack frames, each preceded by its length as a
+# 4-byte little-endian integer. Use `python server.py export-log` for JSONL.
+_FRAME_HEADER_SIZE = 4
+
+
+# Log entries are written by one background thread holding the file open,
+# so tool calls never pay for open/write/close.
+_LOG_QUEUE: "queue.Queue[Any]" = queue.Queue()
+_LOG_STOP = object()
+
+
+def _log_writer() -> None:
+    with open(LOG_FILE, "ab") as f:
+        while True:
+            entry = _LOG_QUEUE.get()
+            if entry is _LOG_STOP:
+                return
+            try:
+                buf = msgpack.packb(entry)
+                f.write(len(buf).to_bytes(_FRAME_HEADER_SIZE, "little") + buf)
+            except Exception as e:
+                # One bad entry (e.g. an unpackable payload) must not stop the writer
+                print(f"Failed to log {entry.get('tool')} event: {e}", file=sys.stderr)
+            if _LOG_QUEUE.empty():
+                f.flush()
+
+
+def _close_log() -> None:
+    """Drain pending log entries and close the file on exit."""
+    _LOG_QUEUE.put_nowait(_LOG_STOP)
+    _LOG_THREAD.join(timeout=2)
+
+
+_LOG_THREAD = threading.Thread(target=_log_writer, name="notification-log", daemon=True)
+_LOG_THREAD.start()
+atexit.register(_close_log)
+
 
 def log_event(tool_name: str, payload: dict[str, Any], success: bool, details: str) -> None:
     """Append tool events for simple troubleshooting."""
@@ -31,8 +77,81 @@ def log_event(tool_name: str, payload: dict[str, Any], success: bool, details: s
         "details": details,
         "payload": payload,
     }
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    _LOG_QUEUE.put_nowait(entry)
+
+
+def read_log_events(path: Path = LOG_FILE) -> Iterator[dict[str, Any]]:
+    """Yield logged events in order, stopping at a partially written frame."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        while True:
+            header = f.read(_FRAME_HEADER_SIZE)
+            if len(header) < _FRAME_HEADER_SIZE:
+                return
+            size = int.from_bytes(header, "little")
+            buf = f.read(size)
+            if len(buf) < size:
+                return
+            yield msgpack.unpackb(buf)
+
+
+def export_log_jsonl(dest: Path = EXPORT_FILE) -> int:
+    """Write the event log as JSON lines, after any legacy JSONL history;
+    returns the number of events."""
+    if Path(dest).resolve() == LEGACY_LOG_FILE.resolve():
+        raise ValueError(f"Refusing to overwrite the legacy log {LEGACY_LOG_FILE}")
+    count = 0
+    with open(dest, "w", encoding="utf-8") as f:
+        try:
+            with open(LEGACY_LOG_FILE, encoding="utf-8") as legacy:
+                for line in legacy:
+                    if line.strip():
+                        f.write(line if line.endswith("\n") else line + "\n")
+                        count += 1
+        except FileNotFoundError:
+            pass
+        for entry in read_log_events():
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+# Notifier backends are imported/constructed on first use and reused.
+# Import failures are cached too, so a missing backend is only probed once.
+_NOTIFIERS: dict[str, Any] = {}
+# Failures are kept as messages: re-raising one stored exception would grow
+# its traceback on every call
+_NOTIFIER_ERRORS: dict[str, str] = {}
+_NOTIFIERS_LOCK = threading.Lock()
+
+
+def _load_plyer() -> Any:
+    from plyer import notification as plyer_notification
+
+    return plyer_notification
+
+
+def _load_toaster() -> Any:
+    from win10toast import ToastNotifier
+
+    return ToastNotifier()
+
+
+def _get_notifier(name: str, factory: Any) -> Any:
+    with _NOTIFIERS_LOCK:
+        if name not in _NOTIFIERS and name not in _NOTIFIER_ERRORS:
+            try:
+                _NOTIFIERS[name] = factory()
+            except Exception as e:
+                _NOTIFIER_ERRORS[name] = str(e)
+        notifier = _NOTIFIERS.get(name)
+        error = _NOTIFIER_ERRORS.get(name)
+    if error is not None:
+        raise RuntimeError(error)
+    return notifier
 
 
 def send_system_notification(title: str, message: str, timeout_seconds: int = 6) -> tuple[bool, str]:
@@ -41,8 +160,7 @@ def send_system_notification(title: str, message: str, timeout_seconds: int = 6)
     Tries plyer first, then win10toast on Windows.
     """
     try:
-        from plyer import notification as plyer_notification
-
+        plyer_notification = _get_notifier("plyer", _load_plyer)
         plyer_notification.notify(
             title=title,
             message=message,
@@ -52,9 +170,10 @@ def send_system_notification(title: str, message: str, timeout_seconds: int = 6)
         return True, "sent using plyer"
     except Exception as plyer_error:
         try:
-            from win10toast import ToastNotifier
-
-            toaster = ToastNotifier()
+            toaster = _get_notifier("win10toast", _load_toaster)
+            # A ToastNotifier ignores new threaded toasts while one is showing
+            if toaster.notification_active():
+                toaster = _load_toaster()
             toaster.show_toast(
                 title=title,
                 msg=message,
@@ -73,6 +192,16 @@ def send_system_notification(title: str, message: str, timeout_seconds: int = 6)
             )
 
 
+_SENT_PREFIX = "Notification sent. "
+_FAILED_PREFIX = "Notification failed. "
+
+
+@lru_cache(maxsize=64)
+def _notification_result(ok: bool, info: str) -> TextContent:
+    """Result block for a notification attempt; info strings repeat, so reuse them."""
+    return TextContent(type="text", text=(_SENT_PREFIX if ok else _FAILED_PREFIX) + info)
+
+
 @server.list_tools()
 async def list_tools() -> list[Tool]:
     return [
@@ -155,36 +284,35 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
             details = args.get("details", "Completed successfully.")
             title = f"Done: {task}"
             message = details
-            ok, info = send_system_notification(title=title, message=message, timeout_seconds=6)
+            ok, info = await asyncio.to_thread(
+                send_system_notification, title=title, message=message, timeout_seconds=6
+            )
             log_event(name, args, ok, info)
-            if ok:
-                return [TextContent(type="text", text=f"Notification sent. {info}")]
-            return [TextContent(type="text", text=f"Notification failed. {info}")]
+            return [_notification_result(ok, info)]
 
         if name == "notify_need_input":
             question = args["question"]
             context = args.get("context", "AI needs your response to continue.")
             title = "Action Needed"
             message = f"{question}\n{context}"
-            ok, info = send_system_notification(title=title, message=message, timeout_seconds=10)
+            ok, info = await asyncio.to_thread(
+                send_system_notification, title=title, message=message, timeout_seconds=10
+            )
             log_event(name, args, ok, info)
-            if ok:
-                return [TextContent(type="text", text=f"Notification sent. {info}")]
-            return [TextContent(type="text", text=f"Notification failed. {info}")]
+            return [_notification_result(ok, info)]
 
         if name == "notify_custom":
             title = args["title"]
             message = args["message"]
             timeout_seconds = int(args.get("timeout_seconds", 6))
-            ok, info = send_system_notification(
+            ok, info = await asyncio.to_thread(
+                send_system_notification,
                 title=title,
                 message=message,
                 timeout_seconds=timeout_seconds,
             )
             log_event(name, args, ok, info)
-            if ok:
-                return [TextContent(type="text", text=f"Notification sent. {info}")]
-            return [TextContent(type="text", text=f"Notification failed. {info}")]
+            return [_notification_result(ok, info)]
 
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
     except KeyError as e:
@@ -207,4 +335,8 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if sys.argv[1:2] == ["export-log"]:
+        dest = Path(sys.argv[2]) if len(sys.argv) > 2 else EXPORT_FILE
+        print(f"Exported {export_log_jsonl(dest)} events to {dest}")
+    else:
+        asyncio.run(main())
@@ -17,17 +17,15 @@ def _load_local_env(base_dir: Path) -> None:
     if not env_path.exists():
         return
 
-    for raw_line in env_path.read_text(encoding='utf-8').splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith('#') or '=' not in line:
-            continue
+    lines = (raw_line.strip() for raw_line in env_path.read_text(encoding='utf-8').splitlines())
+    pairs = (line.split('=', 1) for line in lines if line and not line.startswith('#') and '=' in line)
+    # The first definition of a duplicated key wins
+    parsed = {}
+    for key, value in pairs:
+        parsed.setdefault(key.strip().lstrip('\ufeff'), value.strip().strip('"').strip("'"))
 
-        key, value = line.split('=', 1)
-        key = key.strip().lstrip('\ufeff')
-        value = value.strip().strip('"').strip("'")
-
-        if key and (key not in os.environ or not os.environ.get(key)):
-            os.environ[key] = value
+    # Real environment values win; empty ones are treated as unset
+    os.environ.update({key: value for key, value in parsed.items() if key and not os.environ.get(key)})
 
 
 def main() -> int:
@@ -40,6 +38,13 @@ def main() -> int:
         return 1
 
     cmd = [uvx, 'spotify-mcp-server', *sys.argv[1:]]
+
+    if os.name != 'nt':
+        # Replace this process so stdio goes straight to the server
+        os.execve(uvx, cmd, os.environ)
+
+    # On Windows exec* spawns a new PID and exits this one, which MCP clients
+    # treat as the server dying, so keep relaying as a parent there.
     completed = subprocess.run(cmd, env=os.environ)
     return int(completed.returncode)
 
@@ -5,312 +5,976 @@ A simple MCP server for PC management and automation
 """
 
 import asyncio
+import ctypes
+import fnmatch
+import itertools
+import locale
+import mmap
 import subprocess
 import psutil
 import os
 import platform
+import re
+import shlex
+import signal
+import socket
+import sys
+import time
+import uuid
 from pathlib import Path
-from datetime import datetime
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
 
+try:
+    import ahocorasick  # Optional: pyahocorasick, falls back to re
+except ImportError:
+    ahocorasick = None
+
 # Initialize MCP server
 server = Server("system-commander")
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List all available tools"""
-    return [
-        Tool(
-            name="execute_command",
-            description="Execute a shell command and return the output. Use for running any Windows command. NOTE: Long-running servers (npm run dev, yarn start, etc.) are blocked - run those manually in a terminal.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "The command to execute (e.g., 'dir', 'ipconfig', 'tasklist'). Long-running servers are not allowed."
-                    }
-                },
-                "required": ["command"]
-            }
-        ),
-        Tool(
-            name="get_system_info",
-            description="Get comprehensive system information including CPU, memory, disk usage, and OS details",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="list_processes",
-            description="List all running processes with their PID, name, CPU and memory usage",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filter": {
-                        "type": "string",
-                        "description": "Optional: filter processes by name (case-insensitive)"
-                    }
+# Built once; list_tools hands out the same list on every request
+TOOLS: list[Tool] = [
+    Tool(
+        name="execute_command",
+        description="Execute a shell command and return the output. Use for running any Windows command. NOTE: Long-running servers (npm run dev, yarn start, etc.) are blocked - run those manually in a terminal.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "The command to execute (e.g., 'dir', 'ipconfig', 'tasklist'). Long-running servers are not allowed."
+                }
+            },
+            "required": ["command"]
+        }
+    ),
+    Tool(
+        name="get_system_info",
+        description="Get comprehensive system information including CPU, memory, disk usage, and OS details",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="list_processes",
+        description="List all running processes with their PID, name, CPU and memory usage",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filter": {
+                    "type": "string",
+                    "description": "Optional: filter processes by name (case-insensitive)"
                 }
             }
-        ),
-        Tool(
-            name="kill_process",
-            description="Terminate a process by name or PID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "identifier": {
-                        "type": "string",
-                        "description": "Process name (e.g., 'chrome.exe') or PID number"
-                    }
+        }
+    ),
+    Tool(
+        name="kill_process",
+        description="Terminate a process by name or PID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "identifier": {
+                    "type": "string",
+                    "description": "Process name (e.g., 'chrome.exe') or PID number"
+                }
+            },
+            "required": ["identifier"]
+        }
+    ),
+    Tool(
+        name="search_files",
+        description="Search for files in a directory by name pattern",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string",
+                    "description": "Directory to search in (e.g., 'C:\\Users\\Username\\Downloads')"
                 },
-                "required": ["identifier"]
-            }
-        ),
-        Tool(
-            name="search_files",
-            description="Search for files in a directory by name pattern",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "directory": {
-                        "type": "string",
-                        "description": "Directory to search in (e.g., 'C:\\Users\\Username\\Downloads')"
-                    },
-                    "pattern": {
-                        "type": "string",
-                        "description": "File pattern to search for (e.g., '*.pdf', 'report*')"
-                    },
-                    "recursive": {
-                        "type": "boolean",
-                        "description": "Search subdirectories recursively (default: true)"
-                    }
+                "pattern": {
+                    "type": "string",
+                    "description": "File pattern to search for (e.g., '*.pdf', 'report*')"
                 },
-                "required": ["directory", "pattern"]
-            }
-        ),
-        Tool(
-            name="read_file",
-            description="Read a text file. Use this before editing to inspect current contents.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Path to the file to read"
-                    },
-                    "max_chars": {
-                        "type": "integer",
-                        "description": "Optional max characters to return (default: 20000)"
-                    }
+                "recursive": {
+                    "type": "boolean",
+                    "description": "Search subdirectories recursively (default: true)"
+                }
+            },
+            "required": ["directory", "pattern"]
+        }
+    ),
+    Tool(
+        name="read_file",
+        description="Read a text file. Use this before editing to inspect current contents.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path to the file to read"
                 },
-                "required": ["path"]
-            }
-        ),
-        Tool(
-            name="write_file",
-            description="Write text content to a file (create or overwrite).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Path to file"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Full file content to write"
-                    },
-                    "create_dirs": {
-                        "type": "boolean",
-                        "description": "Create parent directories if missing (default: true)"
-                    }
+                "max_chars": {
+                    "type": "integer",
+                    "description": "Optional max characters to return (default: 20000)"
+                }
+            },
+            "required": ["path"]
+        }
+    ),
+    Tool(
+        name="write_file",
+        description="Write text content to a file (create or overwrite).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path to file"
                 },
-                "required": ["path", "content"]
-            }
-        ),
-        Tool(
-            name="append_file",
-            description="Append text content to the end of a file.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Path to file"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Text to append"
-                    },
-                    "create_dirs": {
-                        "type": "boolean",
-                        "description": "Create parent directories if missing (default: true)"
-                    }
+                "content": {
+                    "type": "string",
+                    "description": "Full file content to write"
                 },
-                "required": ["path", "content"]
-            }
-        ),
-        Tool(
-            name="replace_in_file",
-            description="Replace text inside a file. Use for targeted edits.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Path to file"
-                    },
-                    "find": {
-                        "type": "string",
-                        "description": "Text to find"
-                    },
-                    "replace": {
-                        "type": "string",
-                        "description": "Replacement text"
-                    },
-                    "replace_all": {
-                        "type": "boolean",
-                        "description": "Replace all matches (default: true)"
-                    }
+                "create_dirs": {
+                    "type": "boolean",
+                    "description": "Create parent directories if missing (default: true)"
+                }
+            },
+            "required": ["path", "content"]
+        }
+    ),
+    Tool(
+        name="append_file",
+        description="Append text content to the end of a file.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path to file"
                 },
-                "required": ["path", "find", "replace"]
-            }
-        ),
-        Tool(
-            name="get_network_info",
-            description="Get network information including active connections and network interfaces",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        )
-    ]
+                "content": {
+                    "type": "string",
+                    "description": "Text to append"
+                },
+                "create_dirs": {
+                    "type": "boolean",
+                    "description": "Create parent directories if missing (default: true)"
+                }
+            },
+            "required": ["path", "content"]
+        }
+    ),
+    Tool(
+        name="replace_in_file",
+        description="Replace text inside a file. Use for targeted edits.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Path to file"
+                },
+                "find": {
+                    "type": "string",
+                    "description": "Text to find"
+                },
+                "replace": {
+                    "type": "string",
+                    "description": "Replacement text"
+                },
+                "replace_all": {
+                    "type": "boolean",
+                    "description": "Replace all matches (default: true)"
+                }
+            },
+            "required": ["path", "find", "replace"]
+        }
+    ),
+    Tool(
+        name="get_network_info",
+        description="Get network information including active connections and network interfaces",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    )
+]
 
-def is_dangerous_command(command: str) -> tuple[bool, str]:
-    """Check if a command is dangerous and could harm the system"""
-    command_lower = command.lower()
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List all available tools"""
+    return TOOLS
+
+# Commands that only read a file; a path containing a blocked word is fine.
+# They count only as whole words, so e.g. "concat " or "mytype " don't.
+_READ_COMMANDS: tuple[str, ...] = ('get-content', 'type ', 'cat ', 'more ')
+# Also exempt from the long-running check (e.g. `less server.log`)
+_READ_LONG_COMMANDS: tuple[str, ...] = ('less ',)
+
+# Dangerous/harmful commands
+_DANGEROUS_PATTERNS: tuple[tuple[str, str], ...] = (
+    # Disk/partition operations
+    ('format ', 'Format disk - EXTREMELY DANGEROUS'),
+    ('diskpart', 'Disk partition tool - DANGEROUS'),
+    ('fdisk', 'Disk partition tool - DANGEROUS'),
     
-    # Skip check if it's just a file path
-    if any(x in command_lower for x in ['get-content', 'type ', 'cat ', 'more ']):
-        return False, ""
+    # System file deletion
+    ('del /s', 'Recursive delete - DANGEROUS'),
+    ('rmdir /s', 'Recursive directory removal - DANGEROUS'),
+    ('rd /s', 'Recursive directory removal - DANGEROUS'),
+    ('rm -rf /', 'Recursive force delete - EXTREMELY DANGEROUS'),
+    ('rm -rf *', 'Recursive force delete all - EXTREMELY DANGEROUS'),
+    ('del c:\\windows', 'Delete Windows system files - EXTREMELY DANGEROUS'),
+    ('del c:\\program files', 'Delete Program Files - DANGEROUS'),
     
-    # Dangerous/harmful commands
-    dangerous_patterns = [
-        # Disk/partition operations
-        ('format ', 'Format disk - EXTREMELY DANGEROUS'),
-        ('diskpart', 'Disk partition tool - DANGEROUS'),
-        ('fdisk', 'Disk partition tool - DANGEROUS'),
-        
-        # System file deletion
-        ('del /s', 'Recursive delete - DANGEROUS'),
-        ('rmdir /s', 'Recursive directory removal - DANGEROUS'),
-        ('rd /s', 'Recursive directory removal - DANGEROUS'),
-        ('rm -rf /', 'Recursive force delete - EXTREMELY DANGEROUS'),
-        ('rm -rf *', 'Recursive force delete all - EXTREMELY DANGEROUS'),
-        ('del c:\\windows', 'Delete Windows system files - EXTREMELY DANGEROUS'),
-        ('del c:\\program files', 'Delete Program Files - DANGEROUS'),
-        
-        # Registry operations
-        ('reg delete', 'Registry deletion - DANGEROUS'),
-        ('regedit /s', 'Silent registry import - DANGEROUS'),
-        
-        # System shutdown/restart without confirmation
-        ('shutdown /s /t 0', 'Immediate shutdown'),
-        ('shutdown /r /t 0', 'Immediate restart'),
-        
-        # Bootloader/MBR operations
-        ('bootrec', 'Boot record operations - DANGEROUS'),
-        ('bcdedit', 'Boot configuration - DANGEROUS'),
-        ('dd if=', 'Direct disk write - EXTREMELY DANGEROUS'),
-        
-        # Encryption/disk operations
-        ('cipher /w:', 'Wipe free space - DANGEROUS'),
-        ('convert ', 'File system conversion - DANGEROUS'),
-        
-        # PowerShell dangerous operations
-        ('remove-item -recurse -force', 'PowerShell recursive force delete - DANGEROUS'),
-        ('get-childitem | remove-item', 'PowerShell bulk delete - DANGEROUS'),
-        
-        # Fork bombs and resource exhaustion
-        (':(){ :|:& };:', 'Fork bomb - DANGEROUS'),
-        ('%0|%0', 'Windows fork bomb - DANGEROUS'),
-    ]
+    # Registry operations
+    ('reg delete', 'Registry deletion - DANGEROUS'),
+    ('regedit /s', 'Silent registry import - DANGEROUS'),
+    
+    # System shutdown/restart without confirmation
+    ('shutdown /s /t 0', 'Immediate shutdown'),
+    ('shutdown /r /t 0', 'Immediate restart'),
+    
+    # Bootloader/MBR operations
+    ('bootrec', 'Boot record operations - DANGEROUS'),
+    ('bcdedit', 'Boot configuration - DANGEROUS'),
+    ('dd if=', 'Direct disk write - EXTREMELY DANGEROUS'),
+    
+    # Encryption/disk operations
+    ('cipher /w:', 'Wipe free space - DANGEROUS'),
+    ('convert ', 'File system conversion - DANGEROUS'),
     
-    for pattern, name in dangerous_patterns:
-        if pattern in command_lower:
-            return True, name
+    # PowerShell dangerous operations
+    ('remove-item -recurse -force', 'PowerShell recursive force delete - DANGEROUS'),
+    ('get-childitem | remove-item', 'PowerShell bulk delete - DANGEROUS'),
     
-    return False, ""
+    # Fork bombs and resource exhaustion
+    (':(){ :|:& };:', 'Fork bomb - DANGEROUS'),
+    ('%0|%0', 'Windows fork bomb - DANGEROUS'),
+)
 
-def is_long_running_command(command: str) -> tuple[bool, str]:
-    """Check if a command is likely to be a long-running server/process"""
-    command_lower = command.lower()
+# Blocked patterns for continuous servers
+_LONG_RUNNING_PATTERNS: tuple[tuple[str, str], ...] = (
+    # Node.js servers
+    ('npm run dev', 'npm run dev'),
+    ('npm start', 'npm start'),
+    ('yarn dev', 'yarn dev'),
+    ('yarn start', 'yarn start'),
+    ('pnpm dev', 'pnpm dev'),
+    ('pnpm start', 'pnpm start'),
+    ('node server', 'node server'),
+    ('nodemon', 'nodemon'),
     
-    # Skip check if it's just reading a file with "server" in the path
-    if any(x in command_lower for x in ['get-content', 'type ', 'cat ', 'more ', 'less ']):
-        return False, ""
+    # Python servers
+    ('python -m http.server', 'Python HTTP server'),
+    ('python manage.py runserver', 'Django dev server'),
+    ('flask run', 'Flask dev server'),
+    ('uvicorn', 'Uvicorn server'),
+    ('gunicorn', 'Gunicorn server'),
     
-    # Blocked patterns for continuous servers
-    blocked_patterns = [
-        # Node.js servers
-        ('npm run dev', 'npm run dev'),
-        ('npm start', 'npm start'),
-        ('yarn dev', 'yarn dev'),
-        ('yarn start', 'yarn start'),
-        ('pnpm dev', 'pnpm dev'),
-        ('pnpm start', 'pnpm start'),
-        ('node server', 'node server'),
-        ('nodemon', 'nodemon'),
-        
-        # Python servers
-        ('python -m http.server', 'Python HTTP server'),
-        ('python manage.py runserver', 'Django dev server'),
-        ('flask run', 'Flask dev server'),
-        ('uvicorn', 'Uvicorn server'),
-        ('gunicorn', 'Gunicorn server'),
-        
-        # Build watchers
-        ('webpack --watch', 'Webpack watcher'),
-        ('vite', 'Vite dev server'),
-        ('next dev', 'Next.js dev server'),
-        ('ng serve', 'Angular dev server'),
-        
-        # Other long-running processes
-        ('serve', 'serve command'),
-        ('http-server', 'http-server'),
-        ('live-server', 'live-server'),
+    # Build watchers
+    ('webpack --watch', 'Webpack watcher'),
+    ('vite', 'Vite dev server'),
+    ('next dev', 'Next.js dev server'),
+    ('ng serve', 'Angular dev server'),
+    
+    # Other long-running processes
+    ('serve', 'serve command'),
+    ('http-server', 'http-server'),
+    ('live-server', 'live-server'),
+)
+
+# GUI editors; the file tools should be used instead
+_GUI_PATTERNS: tuple[tuple[str, str], ...] = (
+    ('notepad', 'Notepad'),
+    ('wordpad', 'WordPad'),
+    ('code ', 'VS Code'),
+    ('start notepad', 'Notepad'),
+    ('start "" notepad', 'Notepad'),
+    ('explorer ', 'Windows Explorer'),
+    ('start "" explorer', 'Windows Explorer'),
+)
+
+_PATTERN_TABLES = {
+    "danger": _DANGEROUS_PATTERNS,
+    "long": _LONG_RUNNING_PATTERNS,
+    "gui": _GUI_PATTERNS,
+    "read": tuple((p, "") for p in _READ_COMMANDS),
+    "read_long": tuple((p, "") for p in _READ_LONG_COMMANDS),
+}
+
+# Every pattern of every table goes into one automaton, so a command is
+# scanned once no matter how many patterns there are. Without pyahocorasick
+# all tables are joined into a single precompiled alternation, wrapped in a
+# lookahead so overlapping matches are reported too. The alternation reports
+# one pattern per start offset, which is exact as long as no pattern is a
+# prefix of a pattern in a different table.
+# Values are (kind, index in its table, name, pattern length).
+if ahocorasick is not None:
+    _AUTOMATON = ahocorasick.Automaton()
+    for _kind, _table in _PATTERN_TABLES.items():
+        for _index, (_pattern, _name) in enumerate(_table):
+            _AUTOMATON.add_word(_pattern, (_kind, _index, _name, len(_pattern)))
+    _AUTOMATON.make_automaton()
+else:
+    _AUTOMATON = None
+    _PATTERN_INDEX = {}
+    for _kind, _table in _PATTERN_TABLES.items():
+        for _index, (_pattern, _name) in enumerate(_table):
+            _PATTERN_INDEX.setdefault(_pattern, (_kind, _index, _name, len(_pattern)))
+    _PATTERN_RE = re.compile("(?=(" + "|".join(map(re.escape, _PATTERN_INDEX)) + "))")
+
+def _pattern_matches(command_folded: str):
+    """Yield (end, kind, index, name, length) for each blocklist pattern in the command."""
+    if _AUTOMATON is not None:
+        for end, (kind, index, name, length) in _AUTOMATON.iter(command_folded):
+            yield end + 1, kind, index, name, length
+        return
+    for m in _PATTERN_RE.finditer(command_folded):
+        kind, index, name, length = _PATTERN_INDEX[m.group(1)]
+        yield m.start() + length, kind, index, name, length
+
+def classify_command(command_folded: str) -> tuple[str, str] | None:
+    """Return (kind, name) if a command is blocked, where kind is "danger",
+    "long" or "gui" (checked in that order), else None.
+    
+    Takes command.casefold(), computed once by the caller.
+    """
+    # GUI patterns are matched against the command without surrounding whitespace
+    lo = len(command_folded) - len(command_folded.lstrip())
+    hi = len(command_folded.rstrip())
+    
+    # First pattern (in table order) hit for each kind
+    hits = {}
+    for end, kind, index, name, length in _pattern_matches(command_folded):
+        if kind == "gui" and (end - length < lo or end > hi):
+            continue
+        if kind == "read" or kind == "read_long":
+            start = end - length
+            if start and not command_folded[start - 1].isspace():
+                continue
+            if (end < len(command_folded) and not command_folded[end - 1].isspace()
+                    and not command_folded[end].isspace()):
+                continue
+        if kind not in hits or index < hits[kind][0]:
+            hits[kind] = (index, name)
+    
+    reading = "read" in hits
+    if "danger" in hits and not reading:
+        return "danger", hits["danger"][1]
+    if "long" in hits and not reading and "read_long" not in hits:
+        return "long", hits["long"][1]
+    if "gui" in hits:
+        return "gui", hits["gui"][1]
+    return None
+
+# ─── Process table ────────────────────────────────────────────
+
+# Previous (cpu seconds, monotonic time) per PID, so CPU% is the usage since
+# the last listing instead of a per-process sampling sleep
+_CPU_SAMPLES: dict[int, tuple[float, float]] = {}
+
+if os.name == "nt":
+    class _UNICODE_STRING(ctypes.Structure):
+        _fields_ = [
+            ("Length", ctypes.c_ushort),
+            ("MaximumLength", ctypes.c_ushort),
+            ("Buffer", ctypes.c_void_p),
+        ]
+
+    class _SYSTEM_PROCESS_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ("NextEntryOffset", ctypes.c_ulong),
+            ("NumberOfThreads", ctypes.c_ulong),
+            ("WorkingSetPrivateSize", ctypes.c_longlong),
+            ("HardFaultCount", ctypes.c_ulong),
+            ("NumberOfThreadsHighWatermark", ctypes.c_ulong),
+            ("CycleTime", ctypes.c_ulonglong),
+            ("CreateTime", ctypes.c_longlong),
+            ("UserTime", ctypes.c_longlong),
+            ("KernelTime", ctypes.c_longlong),
+            ("ImageName", _UNICODE_STRING),
+            ("BasePriority", ctypes.c_long),
+            ("UniqueProcessId", ctypes.c_void_p),
+            ("InheritedFromUniqueProcessId", ctypes.c_void_p),
+            ("HandleCount", ctypes.c_ulong),
+            ("SessionId", ctypes.c_ulong),
+            ("UniqueProcessKey", ctypes.c_void_p),
+            ("PeakVirtualSize", ctypes.c_size_t),
+            ("VirtualSize", ctypes.c_size_t),
+            ("PageFaultCount", ctypes.c_ulong),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+        ]
+
+    _SYSTEM_PROCESS_INFORMATION_CLASS = 5
+    _STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+
+    _NtQuerySystemInformation = ctypes.windll.ntdll.NtQuerySystemInformation
+    _NtQuerySystemInformation.argtypes = [
+        ctypes.c_ulong, ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong)
     ]
+    _NtQuerySystemInformation.restype = ctypes.c_ulong
+
+def _iter_processes_nt(needle: str):
+    """(pid, name, cpu seconds, rss bytes) for every process, from one syscall."""
+    size = 1 << 20
+    while True:
+        buf = ctypes.create_string_buffer(size)
+        needed = ctypes.c_ulong()
+        status = _NtQuerySystemInformation(
+            _SYSTEM_PROCESS_INFORMATION_CLASS, buf, size, ctypes.byref(needed)
+        )
+        if status != _STATUS_INFO_LENGTH_MISMATCH:
+            break
+        # Processes can start between calls, so leave some headroom
+        size = max(size * 2, needed.value + (64 << 10))
+    if status:
+        raise OSError(f"NtQuerySystemInformation failed: 0x{status:08X}")
+
+    offset = 0
+    while True:
+        info = _SYSTEM_PROCESS_INFORMATION.from_buffer(buf, offset)
+        pid = info.UniqueProcessId or 0
+        image = info.ImageName
+        if image.Buffer:
+            name = ctypes.wstring_at(image.Buffer, image.Length // 2)
+        else:
+            name = "System Idle Process" if pid == 0 else ""
+        if not needle or needle in name.lower():
+            # UserTime/KernelTime are in 100 ns units
+            yield pid, name, (info.UserTime + info.KernelTime) / 1e7, info.WorkingSetSize
+        if not info.NextEntryOffset:
+            break
+        offset += info.NextEntryOffset
+
+def _iter_processes_linux(needle: str):
+    """(pid, name, cpu seconds, rss bytes) for every process, one stat read each."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    needle_bytes = needle.encode("utf-8")
+    with os.scandir("/proc") as it:
+        for entry in it:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/stat", "rb") as f:
+                    data = f.read()
+                # comm is wrapped in parens and may itself contain ")"
+                lpar = data.index(b"(")
+                rpar = data.rindex(b")")
+                comm = data[lpar + 1:rpar]
+                if len(comm) == 15:
+                    # comm is truncated to 15 bytes; the full name is in argv[0]
+                    with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                        exe = os.path.basename(f.read().split(b"\0", 1)[0])
+                    if exe.startswith(comm):
+                        comm = exe
+                if needle_bytes and needle_bytes not in comm.lower():
+                    continue
+                fields = data[rpar + 2:].split()
+                cpu = (int(fields[11]) + int(fields[12])) / ticks  # utime + stime
+                rss = int(fields[21]) * page_size
+            except (OSError, ValueError, IndexError):
+                continue  # Exited mid-scan, or a kernel thread without access
+            yield int(entry.name), comm.decode("utf-8", "replace"), cpu, rss
+
+def _iter_processes_psutil(needle: str):
+    """(pid, name, cpu seconds, rss bytes) via psutil on other platforms."""
+    # Only the name is fetched for every process; CPU and memory are read
+    # for the ones that pass the filter
+    for proc in psutil.process_iter(['name']):
+        name = proc.info['name'] or ""
+        if needle and needle not in name.lower():
+            continue
+        try:
+            with proc.oneshot():
+                cpu_times = proc.cpu_times()
+                rss = proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        yield proc.pid, name, cpu_times.user + cpu_times.system, rss
+
+if os.name == "nt":
+    _iter_processes = _iter_processes_nt
+elif sys.platform.startswith("linux"):
+    _iter_processes = _iter_processes_linux
+else:
+    _iter_processes = _iter_processes_psutil
+
+def scan_processes(filter_name: str = "") -> list[dict]:
+    """List processes (optionally only names containing filter_name) with
+    pid, name, cpu_percent and memory_percent."""
+    total_memory = psutil.virtual_memory().total
+    now = time.monotonic()
+    samples = {}
+    processes = []
+    for pid, name, cpu, rss in _iter_processes(filter_name.lower()):
+        previous = _CPU_SAMPLES.get(pid)
+        cpu_percent = 0.0
+        if previous is not None and now > previous[1]:
+            cpu_percent = max(0.0, (cpu - previous[0]) / (now - previous[1]) * 100)
+        samples[pid] = (cpu, now)
+        processes.append({
+            'pid': pid,
+            'name': name,
+            'cpu_percent': cpu_percent,
+            'memory_percent': rss / total_memory * 100,
+        })
+    # A full listing replaces the samples so exited PIDs don't pile up
+    if not filter_name:
+        _CPU_SAMPLES.clear()
+    _CPU_SAMPLES.update(samples)
+    return processes
+
+# One list_processes row: PID, name, CPU%, memory%
+_PROCESS_ROW = "{:<8} {:<30} {:<8.1f} {:<10.2f}\n".format
+
+# Lowercased process name -> PIDs, reused by kill_process calls that arrive
+# within _NAME_INDEX_TTL seconds of each other instead of rescanning the
+# process table each time. Dropped after anything is terminated.
+_NAME_INDEX: dict[str, list[int]] = {}
+_NAME_INDEX_TIME = 0.0
+_NAME_INDEX_TTL = 1.0
+
+def _process_name_index() -> dict[str, list[int]]:
+    """Return the name -> PIDs index, rebuilding it when stale."""
+    global _NAME_INDEX_TIME
+    now = time.monotonic()
+    if now - _NAME_INDEX_TIME > _NAME_INDEX_TTL:
+        _NAME_INDEX.clear()
+        for proc in psutil.process_iter(['name']):
+            name = proc.info['name'] or ""
+            _NAME_INDEX.setdefault(name.lower(), []).append(proc.pid)
+        _NAME_INDEX_TIME = now
+    return _NAME_INDEX
+
+def _invalidate_name_index():
+    global _NAME_INDEX_TIME
+    _NAME_INDEX_TIME = 0.0
+
+def kill_processes(identifier: str) -> list[str]:
+    """Terminate a PID, or every process whose name contains identifier."""
+    killed = []
     
-    for pattern, name in blocked_patterns:
-        if pattern in command_lower:
-            return True, name
+    # Try as PID first
+    try:
+        pid = int(identifier)
+    except ValueError:
+        pid = None
+    
+    if pid is not None:
+        proc = psutil.Process(pid)
+        name = proc.name()
+        proc.terminate()
+        _invalidate_name_index()
+        killed.append(f"PID {pid} ({name})")
+        return killed
     
-    return False, ""
-
-def is_gui_launch_command(command: str) -> tuple[bool, str]:
-    """Block launching GUI apps for editing when file tools should be used instead."""
-    command_lower = command.lower().strip()
-
-    gui_patterns = [
-        ('notepad', 'Notepad'),
-        ('wordpad', 'WordPad'),
-        ('code ', 'VS Code'),
-        ('start notepad', 'Notepad'),
-        ('start "" notepad', 'Notepad'),
-        ('explorer ', 'Windows Explorer'),
-        ('start "" explorer', 'Windows Explorer'),
+    # It's a process name
+    identifier_lower = identifier.lower()
+    pids = [
+        pid
+        for name, name_pids in _process_name_index().items()
+        if identifier_lower in name
+        for pid in name_pids
+    ]
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            name = proc.name()
+            proc.terminate()
+            killed.append(f"PID {pid} ({name})")
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    if killed:
+        _invalidate_name_index()
+    return killed
+
+# ─── Network connections ──────────────────────────────────────
+
+# Established TCP connections are read straight from the OS tables instead
+# of psutil.net_connections, which also resolves the owning process of
+# every socket (a walk over every process's open handles) that we never show.
+CONNECTION_LIMIT = 20
+_TCP_ESTABLISHED = "01"  # /proc/net/tcp state
+_MIB_TCP_STATE_ESTAB = 5
+
+if os.name == "nt":
+    class _MIB_TCPROW_OWNER_PID(ctypes.Structure):
+        _fields_ = [
+            ("dwState", ctypes.c_uint32),
+            ("dwLocalAddr", ctypes.c_uint32),
+            ("dwLocalPort", ctypes.c_uint32),
+            ("dwRemoteAddr", ctypes.c_uint32),
+            ("dwRemotePort", ctypes.c_uint32),
+            ("dwOwningPid", ctypes.c_uint32),
+        ]
+
+    class _MIB_TCP6ROW_OWNER_PID(ctypes.Structure):
+        _fields_ = [
+            ("ucLocalAddr", ctypes.c_ubyte * 16),
+            ("dwLocalScopeId", ctypes.c_uint32),
+            ("dwLocalPort", ctypes.c_uint32),
+            ("ucRemoteAddr", ctypes.c_ubyte * 16),
+            ("dwRemoteScopeId", ctypes.c_uint32),
+            ("dwRemotePort", ctypes.c_uint32),
+            ("dwState", ctypes.c_uint32),
+            ("dwOwningPid", ctypes.c_uint32),
+        ]
+
+    _TCP_TABLE_OWNER_PID_CONNECTIONS = 4
+    _ERROR_INSUFFICIENT_BUFFER = 122
+
+    _GetExtendedTcpTable = ctypes.windll.iphlpapi.GetExtendedTcpTable
+    _GetExtendedTcpTable.argtypes = [
+        ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32), ctypes.c_int,
+        ctypes.c_uint32, ctypes.c_int, ctypes.c_uint32
     ]
+    _GetExtendedTcpTable.restype = ctypes.c_uint32
+
+def _established_nt():
+    """Yield (local, remote) for established TCP connections via GetExtendedTcpTable."""
+    for family, row_type in ((socket.AF_INET, _MIB_TCPROW_OWNER_PID),
+                             (socket.AF_INET6, _MIB_TCP6ROW_OWNER_PID)):
+        size = ctypes.c_uint32(0)
+        buf = None
+        while True:
+            status = _GetExtendedTcpTable(buf, ctypes.byref(size), False, family,
+                                          _TCP_TABLE_OWNER_PID_CONNECTIONS, 0)
+            if status != _ERROR_INSUFFICIENT_BUFFER:
+                break
+            buf = ctypes.create_string_buffer(size.value)
+        if status or buf is None:
+            continue
+        count = ctypes.c_uint32.from_buffer(buf).value
+        # Rows start after dwNumEntries, aligned to the row's alignment
+        offset = max(ctypes.sizeof(ctypes.c_uint32), ctypes.alignment(row_type))
+        rows = (row_type * count).from_buffer(buf, offset)
+        for row in rows:
+            if row.dwState != _MIB_TCP_STATE_ESTAB:
+                continue
+            if family == socket.AF_INET:
+                local = socket.inet_ntoa(row.dwLocalAddr.to_bytes(4, "little"))
+                remote = socket.inet_ntoa(row.dwRemoteAddr.to_bytes(4, "little"))
+            else:
+                local = socket.inet_ntop(family, bytes(row.ucLocalAddr))
+                remote = socket.inet_ntop(family, bytes(row.ucRemoteAddr))
+            # Ports are in network byte order in the low 16 bits
+            yield (f"{local}:{socket.ntohs(row.dwLocalPort & 0xFFFF)}",
+                   f"{remote}:{socket.ntohs(row.dwRemotePort & 0xFFFF)}")
+
+def _proc_net_address(text: str) -> str:
+    """Decode a /proc/net/tcp{,6} "ADDR:PORT" (address words in host order)."""
+    addr, port = text.split(":")
+    raw = b"".join(int(addr[i:i + 8], 16).to_bytes(4, sys.byteorder) for i in range(0, len(addr), 8))
+    family = socket.AF_INET if len(raw) == 4 else socket.AF_INET6
+    return f"{socket.inet_ntop(family, raw)}:{int(port, 16)}"
+
+def _established_linux():
+    """Yield (local, remote) for established TCP connections from /proc/net."""
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(path, "r") as f:
+                next(f, None)  # Header
+                for line in f:
+                    fields = line.split(None, 4)
+                    if fields[3] == _TCP_ESTABLISHED:
+                        yield _proc_net_address(fields[1]), _proc_net_address(fields[2])
+        except OSError:
+            continue  # No IPv6, or /proc/net not readable
+
+def _established_psutil():
+    for conn in psutil.net_connections(kind='tcp'):
+        if conn.status == psutil.CONN_ESTABLISHED:
+            local = f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else "N/A"
+            remote = f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else "N/A"
+            yield local, remote
+
+if os.name == "nt":
+    _established = _established_nt
+elif sys.platform.startswith("linux"):
+    _established = _established_linux
+else:
+    _established = _established_psutil
+
+def established_connections(limit: int = CONNECTION_LIMIT) -> tuple[list[tuple[str, str]], int]:
+    """The first `limit` established TCP connections as (local, remote), and the total count."""
+    shown = []
+    total = 0
+    for conn in _established():
+        if total < limit:
+            shown.append(conn)
+        total += 1
+    return shown, total
+
+# ─── File search ──────────────────────────────────────────────
+
+SEARCH_LIMIT = 100
+_GLOB_MAGIC = re.compile('[*?[]')
+
+def _literal_base(directory: str, parts: list[str]) -> tuple[str, list[str]]:
+    """Join the leading wildcard-free segments onto directory so they are
+    never scanned; the last segment always stays for the walker."""
+    split = next((i for i, p in enumerate(parts) if _GLOB_MAGIC.search(p)), len(parts))
+    split = min(split, len(parts) - 1)
+    return os.path.join(directory, *parts[:split]), parts[split:]
+
+def _match_dirs(segments: list, names: tuple) -> bool:
+    """Match directory names against segment regexes; None stands for a **
+    and matches zero or more directories."""
+    if not segments:
+        return not names
+    head, rest = segments[0], segments[1:]
+    if head is None:
+        return any(_match_dirs(rest, names[i:]) for i in range(len(names) + 1))
+    return bool(names) and bool(head.match(names[0])) and _match_dirs(rest, names[1:])
+
+def _iter_matches(directory: str, parts: list[str], recursive: bool):
+    """Yield DirEntry objects matching a glob split into path segments.
+    
+    Walks depth-first like glob's **, so single-segment results come out in
+    the same order. Hidden names only match segments that start with '.',
+    and ** never descends into hidden directories (both as in glob).
+    """
+    if recursive and len(parts) > 1 and parts[-1] == '**':
+        # A trailing ** is everything below the directories matching the
+        # rest, directories included: an inner ** followed by *
+        parts = parts + ['*']
+    # Same case rules as glob: case-insensitive on Windows
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    last = re.compile(fnmatch.translate(parts[-1]), flags)
+    # A ** between segments can span any number of directories, so those
+    # patterns keep the whole relative path rather than the last n names
+    parents = [None if recursive and p == '**' else re.compile(fnmatch.translate(p), flags)
+               for p in parts[:-1]]
+    deep = None in parents
+    n = len(parents)
+    match_hidden = parts[-1].startswith('.')
+    dotted = [p.startswith('.') for p in parts[:-1]]
+    enter_hidden = any(dotted)
+    # (path, names of the last n directories walked through, or all of them
+    # when deep, depth)
+    stack = [(directory, (), 0)]
+    while stack:
+        current, tail, depth = stack.pop()
+        # Directory segments are checked once per directory, not per entry
+        if deep:
+            parents_ok = _match_dirs([None] + parents, tail)
+        else:
+            parents_ok = depth >= n and all(r.match(p) for r, p in zip(parents, tail))
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    name = entry.name
+                    hidden = name.startswith('.')
+                    if parents_ok and (match_hidden or not hidden) and last.match(name):
+                        yield entry
+                    if recursive:
+                        if hidden and not enter_hidden:
+                            continue
+                    elif (depth >= n or (hidden and not dotted[depth])
+                          or not parents[depth].match(name)):
+                        # Without ** only names matching the next segment can
+                        # lead anywhere, so the rest never get an is_dir() call
+                        continue
+                    # Don't follow directory symlinks; they can loop
+                    if entry.is_dir(follow_symlinks=False):
+                        if deep:
+                            names = tail + (name,)
+                        else:
+                            names = (tail + (name,))[-n:] if n else ()
+                        subdirs.append((entry.path, names, depth + 1))
+        except OSError:
+            continue  # Unreadable directory, skipped like glob does
+        stack.extend(reversed(subdirs))
+
+# ─── Shell pool ───────────────────────────────────────────────
+
+# One long-lived shell runs every execute_command, so each call costs a
+# pipe round trip instead of a new shell process. Output is read up to a
+# sentinel echoed after each command. Everything is asyncio-based so a
+# running command never blocks other tool calls.
+COMMAND_TIMEOUT = 30
+SHELL_READ_SIZE = 65536
+_SENTINEL = f"__system_commander_{uuid.uuid4().hex}__".encode()
+_ENCODING = locale.getpreferredencoding(False)
+_SHELL: asyncio.subprocess.Process | None = None
+_SHELL_LOCK = asyncio.Lock()
+
+def _shell_lines(command: str | None) -> bytes:
+    """The command (if any) plus a sentinel echo, as shell input."""
+    sentinel = _SENTINEL.decode()
+    if os.name == "nt":
+        text = ""
+        if command is not None:
+            # A child cmd keeps cd/set local, and an unbalanced ( or a prompt
+            # ends at EOF instead of reading on past the sentinel. Every line
+            # must reach the child, so line breaks become command separators.
+            command = " & ".join(line for line in command.splitlines() if line.strip())
+            text += f'cmd /c "{command}" < nul\r\n'
+        text += f'echo {sentinel}\r\n'
+    else:
+        text = ""
+        if command is not None:
+            # Quoted for eval, so unclosed quotes or heredocs are a syntax
+            # error rather than swallowing the sentinel; the subshell keeps
+            # cd/export local, and stdin must not eat our input
+            text += f'( eval {shlex.quote(command)} ) < /dev/null\n'
+        text += f'echo {sentinel}\n'
+    return text.encode(_ENCODING, "replace")
+
+async def _kill_shell(proc: asyncio.subprocess.Process) -> None:
+    """Kill the shell and anything it started."""
+    try:
+        if os.name == "nt":
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill", "/T", "/F", "/PID", str(proc.pid),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            await killer.wait()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        pass
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+async def _read_until_sentinel(proc: asyncio.subprocess.Process) -> tuple[bytes, bool]:
+    """Shell output up to the sentinel, and whether the sentinel was seen."""
+    buf = bytearray()
+    scan_from = 0
+    while True:
+        chunk = await proc.stdout.read(SHELL_READ_SIZE)
+        if not chunk:
+            return bytes(buf), False
+        buf += chunk
+        idx = buf.find(_SENTINEL, scan_from)
+        # Wait for the rest of the sentinel's line so it isn't left for the next command
+        if idx != -1 and buf.find(b"\n", idx) != -1:
+            # Output without a trailing newline shares the sentinel's line
+            return bytes(buf[:idx]), True
+        if idx == -1:
+            scan_from = max(0, len(buf) - len(_SENTINEL))
+
+async def _start_shell() -> asyncio.subprocess.Process:
+    args = ["cmd.exe", "/Q", "/K"] if os.name == "nt" else ["/bin/sh"]
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        # Own process group so a timeout can kill the whole tree
+        start_new_session=(os.name != "nt")
+    )
+    # Swallow the startup banner
+    proc.stdin.write(_shell_lines(None))
+    await proc.stdin.drain()
+    await _read_until_sentinel(proc)
+    return proc
+
+async def run_in_shell(command: str) -> str:
+    """Run a command in the pooled shell and return its combined output."""
+    global _SHELL
+    async with _SHELL_LOCK:
+        if _SHELL is None or _SHELL.returncode is not None:
+            _SHELL = await _start_shell()
+        proc = _SHELL
+        
+        timed_out = False
+        try:
+            proc.stdin.write(_shell_lines(command))
+            await proc.stdin.drain()
+            output, finished = await asyncio.wait_for(_read_until_sentinel(proc), COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            output, finished, timed_out = b"", False, True
+        except OSError:  # Broken pipe: the shell is gone
+            output, finished = b"", False
+        
+        if not finished:
+            # Timed out, or the command exited the shell; start fresh next time
+            await _kill_shell(proc)
+            _SHELL = None
+            if timed_out:
+                raise subprocess.TimeoutExpired(command, COMMAND_TIMEOUT)
+        return output.decode(_ENCODING, "replace").replace("\r\n", "\n")
+
+# ─── File editing ─────────────────────────────────────────────
 
-    for pattern, name in gui_patterns:
-        if pattern in command_lower:
-            return True, name
+def _replace_in_place(f, find_bytes: bytes, replace_bytes: bytes, replace_all: bool) -> int:
+    """Overwrite same-length matches through an mmap; untouched bytes are never rewritten."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return 0
+    n = len(find_bytes)
+    replacements = 0
+    with mmap.mmap(f.fileno(), 0) as mm:
+        i = mm.find(find_bytes)
+        while i != -1:
+            mm[i:i + n] = replace_bytes
+            replacements += 1
+            if not replace_all:
+                break
+            i = mm.find(find_bytes, i + n)
+    return replacements
 
-    return False, ""
+def replace_text_in_file(path_obj: Path, find_text: str, replace_text: str, replace_all: bool) -> int:
+    """Replace find_text in a file with one open handle; returns the number of replacements."""
+    find_bytes = find_text.encode("utf-8")
+    replace_bytes = replace_text.encode("utf-8")
+    
+    with path_obj.open("r+b") as f:
+        # Same-length edits without newlines (or U+FFFD) can't be affected by
+        # newline translation or decoding, so they are patched in place
+        if (find_bytes and len(find_bytes) == len(replace_bytes)
+                and not any(c in find_text + replace_text for c in "\r\n\ufffd")):
+            return _replace_in_place(f, find_bytes, replace_bytes, replace_all)
+        
+        # Same newline handling as text mode: read as \n, write as os.linesep
+        original = f.read().decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+        
+        # One pass both substitutes and counts; escaping keeps find and
+        # replace literal
+        updated, replacements = re.subn(
+            re.escape(find_text),
+            replace_text.replace('\\', '\\\\'),
+            original,
+            count=0 if replace_all else 1
+        )
+        if replacements == 0:
+            return 0
+        
+        if os.linesep != "\n":
+            updated = updated.replace("\n", os.linesep)
+        f.seek(0)
+        f.write(updated.encode("utf-8"))
+        f.truncate()
+    return replacements
+
+WRITE_CHUNK_SIZE = 1 << 20
+
+def write_text_chunks(path_obj: Path, content: str, mode: str = "wb"):
+    """Write content as UTF-8 (newlines as os.linesep, like text mode).
+    
+    The content is encoded once and written in 1 MiB memoryview slices, so
+    large writes don't go through a text-layer copy of the whole buffer.
+    """
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    data = memoryview(content.encode("utf-8"))
+    with path_obj.open(mode) as f:
+        for start in range(0, len(data), WRITE_CHUNK_SIZE):
+            f.write(data[start:start + WRITE_CHUNK_SIZE])
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
@@ -320,20 +984,22 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
         if name == "execute_command":
             command = arguments["command"]
             
+            # One pass over the command covers all three blocklists
+            blocked = classify_command(command.casefold())
+            kind, blocked_name = blocked if blocked else (None, "")
+            
             # Check for dangerous commands first
-            is_danger, danger_name = is_dangerous_command(command)
-            if is_danger:
+            if kind == "danger":
                 error_msg = f"""🛑 DANGEROUS COMMAND BLOCKED
 
 Command: {command}
-Reason: {danger_name}
+Reason: {blocked_name}
 
 This command has been permanently blocked. It will never be executed through this MCP server."""
                 return [TextContent(type="text", text=error_msg)]
             
             # Check for long-running commands
-            is_blocked, blocked_name = is_long_running_command(command)
-            if is_blocked:
+            if kind == "long":
                 error_msg = f"""❌ Command blocked: {blocked_name}
 
 This command would start a long-running server/process, which is not allowed through this MCP server.
@@ -349,9 +1015,8 @@ Please run this command manually in your terminal instead."""
                 return [TextContent(type="text", text=error_msg)]
 
             # Block GUI editor launches so agent uses dedicated file edit tools
-            is_gui, gui_name = is_gui_launch_command(command)
-            if is_gui:
-                error_msg = f"""❌ GUI editor launch blocked: {gui_name}
+            if kind == "gui":
+                error_msg = f"""❌ GUI editor launch blocked: {blocked_name}
 
 Command: {command}
 
@@ -364,20 +1029,16 @@ Use file tools instead:
 This keeps edits deterministic and auditable."""
                 return [TextContent(type="text", text=error_msg)]
             
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            output = result.stdout if result.stdout else result.stderr
+            output = await run_in_shell(command)
             return [TextContent(type="text", text=output or "Command executed with no output")]
         
         elif name == "get_system_info":
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            # cpu_percent samples for a full second; the other probes overlap with it
+            cpu_percent, memory, disk = await asyncio.gather(
+                asyncio.to_thread(psutil.cpu_percent, 1),
+                asyncio.to_thread(psutil.virtual_memory),
+                asyncio.to_thread(psutil.disk_usage, '/'),
+            )
             
             info = f"""System Information:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -398,58 +1059,38 @@ Disk:
   Used: {disk.used / (1024**3):.2f} GB ({disk.percent}%)
   Free: {disk.free / (1024**3):.2f} GB
 
-Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:%S')}
+Boot Time: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(psutil.boot_time()))}
 """
             return [TextContent(type="text", text=info)]
         
         elif name == "list_processes":
             filter_name = arguments.get("filter", "").lower()
-            processes = []
-            
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    if filter_name and filter_name not in proc.info['name'].lower():
-                        continue
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+            processes = await asyncio.to_thread(scan_processes, filter_name)
             
             # Sort by memory usage
             processes.sort(key=lambda x: x['memory_percent'], reverse=True)
             
-            output = "Running Processes:\n"
-            output += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            output += f"{'PID':<8} {'Name':<30} {'CPU%':<8} {'Memory%':<10}\n"
-            output += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            
-            for proc in processes[:50]:  # Limit to top 50
-                output += f"{proc['pid']:<8} {proc['name'][:29]:<30} {proc['cpu_percent']:<8.1f} {proc['memory_percent']:<10.2f}\n"
+            rows = [
+                "Running Processes:\n",
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n",
+                f"{'PID':<8} {'Name':<30} {'CPU%':<8} {'Memory%':<10}\n",
+                "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n",
+            ]
+            rows.extend(
+                _PROCESS_ROW(p['pid'], p['name'][:29], p['cpu_percent'], p['memory_percent'])
+                for p in processes[:50]  # Limit to top 50
+            )
             
             if len(processes) > 50:
-                output += f"\n... and {len(processes) - 50} more processes"
+                rows.append(f"\n... and {len(processes) - 50} more processes")
             
-            return [TextContent(type="text", text=output)]
+            return [TextContent(type="text", text="".join(rows))]
         
         elif name == "kill_process":
             identifier = arguments["identifier"]
-            killed = []
             
-            # Try as PID first
             try:
-                pid = int(identifier)
-                proc = psutil.Process(pid)
-                name = proc.name()
-                proc.terminate()
-                killed.append(f"PID {pid} ({name})")
-            except ValueError:
-                # It's a process name
-                for proc in psutil.process_iter(['pid', 'name']):
-                    try:
-                        if identifier.lower() in proc.info['name'].lower():
-                            proc.terminate()
-                            killed.append(f"PID {proc.info['pid']} ({proc.info['name']})")
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
+                killed = await asyncio.to_thread(kill_processes, identifier)
             except psutil.NoSuchProcess:
                 return [TextContent(type="text", text=f"Process not found: {identifier}")]
             except psutil.AccessDenied:
@@ -465,50 +1106,81 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
             pattern = arguments["pattern"]
             recursive = arguments.get("recursive", True)
             
-            import glob
-            
             if not os.path.exists(directory):
                 return [TextContent(type="text", text=f"Directory not found: {directory}")]
             
-            search_pattern = os.path.join(directory, "**" if recursive else "", pattern)
-            files = glob.glob(search_pattern, recursive=recursive)
+            parts = [p for p in re.split(r'[\\/]' if os.name == "nt" else '/', pattern) if p]
+            if recursive:
+                while len(parts) > 1 and parts[0] == '**':
+                    parts.pop(0)  # The recursive walk already covers a leading **
+            if not parts:
+                return [TextContent(type="text", text=f"Invalid pattern: '{pattern}'")]
+            
+            root = directory
+            if not recursive:
+                # e.g. reports/2024/*.pdf only scans reports/2024
+                root, parts = _literal_base(directory, parts)
+                if not os.path.isdir(root):
+                    return [TextContent(type="text", text=f"No files found matching '{pattern}' in {directory}")]
+            
+            matches = _iter_matches(root, parts, recursive)
+            # Stop walking once we know there are more results than we show
+            files = list(itertools.islice(matches, SEARCH_LIMIT + 1))
             
             if not files:
                 return [TextContent(type="text", text=f"No files found matching '{pattern}' in {directory}")]
             
-            output = f"Found {len(files)} file(s):\n"
-            output += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            truncated = len(files) > SEARCH_LIMIT
+            files = files[:SEARCH_LIMIT]
             
-            for file in files[:100]:  # Limit to 100 results
-                size = os.path.getsize(file) / 1024  # KB
-                modified = datetime.fromtimestamp(os.path.getmtime(file)).strftime('%Y-%m-%d %H:%M')
-                output += f"{file}\n  Size: {size:.2f} KB | Modified: {modified}\n\n"
+            if truncated:
+                rows = [f"Found more than {SEARCH_LIMIT} files, showing the first {SEARCH_LIMIT}:\n"]
+            else:
+                rows = [f"Found {len(files)} file(s):\n"]
+            rows.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
             
-            if len(files) > 100:
-                output += f"... and {len(files) - 100} more files"
+            for entry in files:
+                try:
+                    st = entry.stat()  # One stat per result (cached by scandir on Windows)
+                except OSError:
+                    continue
+                size = st.st_size / 1024  # KB
+                modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(st.st_mtime))
+                rows.append(f"{entry.path}\n  Size: {size:.2f} KB | Modified: {modified}\n\n")
             
-            return [TextContent(type="text", text=output)]
+            if truncated:
+                rows.append("... more files not shown; narrow the pattern or directory")
+            
+            return [TextContent(type="text", text="".join(rows))]
 
         elif name == "read_file":
             file_path = arguments["path"]
             max_chars = int(arguments.get("max_chars", 20000))
             path_obj = Path(file_path)
 
-            if not path_obj.exists():
+            try:
+                f = path_obj.open("rb")
+            except FileNotFoundError:
                 return [TextContent(type="text", text=f"File not found: {file_path}")]
-            if path_obj.is_dir():
-                return [TextContent(type="text", text=f"Path is a directory, not a file: {file_path}")]
+            except (IsADirectoryError, PermissionError):
+                if path_obj.is_dir():
+                    return [TextContent(type="text", text=f"Path is a directory, not a file: {file_path}")]
+                raise
 
-            content = path_obj.read_text(encoding="utf-8", errors="replace")
-            truncated = False
-            if len(content) > max_chars:
-                content = content[:max_chars]
-                truncated = True
+            # Only read what can be returned (UTF-8 is at most 4 bytes per
+            # character) instead of the whole file
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                raw = f.read(max(max_chars, 0) * 4)
+            # Same newline handling as text mode
+            content = raw.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+            truncated = len(content) > max_chars or len(raw) < size
+            content = content[:max_chars]
 
             output = f"Read file: {path_obj}\n"
             output += f"Characters returned: {len(content)}"
             if truncated:
-                output += f" (truncated from {path_obj.stat().st_size} bytes)"
+                output += f" (truncated from {size} bytes)"
             output += "\n\n"
             output += content
             return [TextContent(type="text", text=output)]
@@ -522,7 +1194,7 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
             if create_dirs:
                 path_obj.parent.mkdir(parents=True, exist_ok=True)
 
-            path_obj.write_text(content, encoding="utf-8")
+            write_text_chunks(path_obj, content)
             return [TextContent(
                 type="text",
                 text=f"Wrote {len(content)} characters to {path_obj}"
@@ -537,8 +1209,7 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
             if create_dirs:
                 path_obj.parent.mkdir(parents=True, exist_ok=True)
 
-            with path_obj.open("a", encoding="utf-8") as f:
-                f.write(content)
+            write_text_chunks(path_obj, content, "ab")
 
             return [TextContent(
                 type="text",
@@ -557,19 +1228,10 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
             if path_obj.is_dir():
                 return [TextContent(type="text", text=f"Path is a directory, not a file: {file_path}")]
 
-            original = path_obj.read_text(encoding="utf-8", errors="replace")
-
-            if find_text not in original:
+            replacements = replace_text_in_file(path_obj, find_text, replace_text, replace_all)
+            if replacements == 0:
                 return [TextContent(type="text", text=f"No matches found in {path_obj}")]
 
-            if replace_all:
-                updated = original.replace(find_text, replace_text)
-            else:
-                updated = original.replace(find_text, replace_text, 1)
-
-            replacements = original.count(find_text) if replace_all else 1
-            path_obj.write_text(updated, encoding="utf-8")
-
             return [TextContent(
                 type="text",
                 text=f"Replaced {replacements} occurrence(s) in {path_obj}"
@@ -577,42 +1239,39 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
         
         elif name == "get_network_info":
             # Network interfaces
-            interfaces = psutil.net_if_addrs()
-            stats = psutil.net_if_stats()
+            interfaces, stats, (connections, connection_count) = await asyncio.gather(
+                asyncio.to_thread(psutil.net_if_addrs),
+                asyncio.to_thread(psutil.net_if_stats),
+                asyncio.to_thread(established_connections),
+            )
             
-            output = "Network Information:\n"
-            output += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            rows = ["Network Information:\n", "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"]
             
             for interface_name, addresses in interfaces.items():
                 if interface_name in stats:
                     stat = stats[interface_name]
-                    output += f"Interface: {interface_name}\n"
-                    output += f"  Status: {'Up' if stat.isup else 'Down'}\n"
-                    output += f"  Speed: {stat.speed} Mbps\n"
+                    rows.append(f"Interface: {interface_name}\n")
+                    rows.append(f"  Status: {'Up' if stat.isup else 'Down'}\n")
+                    rows.append(f"  Speed: {stat.speed} Mbps\n")
                     
                     for addr in addresses:
                         if addr.family == 2:  # IPv4
-                            output += f"  IPv4: {addr.address}\n"
+                            rows.append(f"  IPv4: {addr.address}\n")
                         elif addr.family == 23:  # IPv6
-                            output += f"  IPv6: {addr.address}\n"
-                    output += "\n"
+                            rows.append(f"  IPv6: {addr.address}\n")
+                    rows.append("\n")
             
             # Network connections
-            connections = psutil.net_connections(kind='inet')
-            active_connections = [c for c in connections if c.status == 'ESTABLISHED']
+            rows.append(f"\nActive Connections: {connection_count}\n")
+            rows.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
             
-            output += f"\nActive Connections: {len(active_connections)}\n"
-            output += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+            for local, remote in connections:  # Show top 20
+                rows.append(f"{local} → {remote}\n")
             
-            for conn in active_connections[:20]:  # Show top 20
-                local = f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else "N/A"
-                remote = f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else "N/A"
-                output += f"{local} → {remote}\n"
+            if connection_count > len(connections):
+                rows.append(f"... and {connection_count - len(connections)} more connections\n")
             
-            if len(active_connections) > 20:
-                output += f"... and {len(active_connections) - 20} more connections\n"
-            
-            return [TextContent(type="text", text=output)]
+            return [TextContent(type="text", text="".join(rows))]
         
         else:
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Test script to verify search_files glob matching, including inner and trailing **"""
+
+import os
+import re
+import tempfile
+
+from server import _iter_matches
+
+def search(directory: str, pattern: str, recursive: bool = True) -> list[str]:
+    """Same pattern handling as the search_files tool, as sorted relative paths"""
+    parts = [p for p in re.split(r'[\\/]' if os.name == "nt" else '/', pattern) if p]
+    if recursive:
+        while len(parts) > 1 and parts[0] == '**':
+            parts.pop(0)
+    found = [os.path.relpath(e.path, directory) for e in _iter_matches(directory, parts, recursive)]
+    return sorted(p.replace(os.sep, '/') for p in found)
+
+with tempfile.TemporaryDirectory() as root:
+    for rel in ["sub/x.txt", "sub/a/y.txt", "sub/a/b/z.txt", "sub/a/b/z.log", "other/w.txt"]:
+        path = os.path.join(root, *rel.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w').close()
+
+    cases = [
+        ("sub/**/*.txt", True, ["sub/a/b/z.txt", "sub/a/y.txt", "sub/x.txt"]),
+        ("**/sub/**/*.txt", True, ["sub/a/b/z.txt", "sub/a/y.txt", "sub/x.txt"]),
+        ("sub/**/b/*.txt", True, ["sub/a/b/z.txt"]),
+        ("sub/*.txt", True, ["sub/x.txt"]),
+        ("*.txt", True, ["other/w.txt", "sub/a/b/z.txt", "sub/a/y.txt", "sub/x.txt"]),
+        ("sub/**", True, ["sub/a", "sub/a/b", "sub/a/b/z.log", "sub/a/b/z.txt", "sub/a/y.txt", "sub/x.txt"]),
+        ("a/**", True, ["sub/a/b", "sub/a/b/z.log", "sub/a/b/z.txt", "sub/a/y.txt"]),
+        ("sub/**/*.txt", False, ["sub/a/y.txt"]),
+    ]
+
+    print("=" * 70)
+    print("TESTING SEARCH PATTERNS")
+    print("=" * 70)
+
+    failed = 0
+    for pattern, recursive, expected in cases:
+        got = search(root, pattern, recursive)
+        ok = got == expected
+        failed += not ok
+        status = "✅ PASS" if ok else "❌ FAIL"
+        print(f"{status:<10} {pattern} (recursive={recursive})")
+        if not ok:
+            print(f"           expected {expected}\n           got      {got}")
+
+    print("=" * 70)
+    if failed:
+        raise SystemExit(f"{failed} case(s) failed")
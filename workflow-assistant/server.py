@@ -5,23 +5,44 @@ Productivity tools for AI-assisted PC usage
 """
 
 import asyncio
+import atexit
+import heapq
 import os
 import json
+import signal
 import subprocess
+import sys
+import threading
+import time
 import uuid
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
 
+try:
+    import orjson  # Optional: much faster JSON encode/decode for the stores
+except ImportError:
+    orjson = None
+
+try:
+    # Optional (pywin32): talk to the clipboard directly instead of
+    # starting a PowerShell process per call
+    import win32clipboard
+    import win32con
+except ImportError:
+    win32clipboard = None
+
 # Initialize MCP server
 server = Server("workflow-assistant")
 
 # Storage paths
 STORAGE_DIR = Path.home() / ".workflow-assistant"
 STORAGE_DIR.mkdir(exist_ok=True)
-CLIPBOARD_HISTORY = STORAGE_DIR / "clipboard_history.json"
+CLIPBOARD_HISTORY = STORAGE_DIR / "clipboard_history.jsonl"
+_LEGACY_CLIPBOARD_HISTORY = STORAGE_DIR / "clipboard_history.json"
 QUICK_NOTES = STORAGE_DIR / "quick_notes.json"
 BOOKMARKS = STORAGE_DIR / "bookmarks.json"
 
@@ -36,519 +57,914 @@ def _get_history_limit() -> int:
 
 HISTORY_LIMIT = _get_history_limit()
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List all available tools"""
-    return [
-        Tool(
-            name="clipboard_read",
-            description="Read the current clipboard content",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="clipboard_write",
-            description="Write text to the clipboard",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "Text to copy to clipboard"
-                    }
+# Built once; list_tools hands out the same list on every request
+TOOLS: list[Tool] = [
+    Tool(
+        name="clipboard_read",
+        description="Read the current clipboard content",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="clipboard_write",
+        description="Write text to the clipboard",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "Text to copy to clipboard"
+                }
+            },
+            "required": ["text"]
+        }
+    ),
+    Tool(
+        name="clipboard_history",
+        description="View recent clipboard history (up to configured limit)",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="quick_note",
+        description="Save a quick note with optional tags",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "content": {
+                    "type": "string",
+                    "description": "Note content"
                 },
-                "required": ["text"]
-            }
-        ),
-        Tool(
-            name="clipboard_history",
-            description="View recent clipboard history (up to configured limit)",
-            inputSchema={
-                "type": "object",
-                "properties": {}
+                "tags": {
+                    "type": "string",
+                    "description": "Comma-separated tags (optional)"
+                }
+            },
+            "required": ["content"]
+        }
+    ),
+    Tool(
+        name="list_notes",
+        description="List all quick notes, optionally filtered by tag",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tag": {
+                    "type": "string",
+                    "description": "Filter by tag (optional)"
+                }
             }
-        ),
-        Tool(
-            name="quick_note",
-            description="Save a quick note with optional tags",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "content": {
-                        "type": "string",
-                        "description": "Note content"
-                    },
-                    "tags": {
-                        "type": "string",
-                        "description": "Comma-separated tags (optional)"
-                    }
+        }
+    ),
+    Tool(
+        name="delete_note",
+        description="Delete a note by its ID",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "note_id": {
+                    "type": "string",
+                    "description": "Note ID to delete"
+                }
+            },
+            "required": ["note_id"]
+        }
+    ),
+    Tool(
+        name="bookmark_add",
+        description="Add a bookmark (file path, URL, or command)",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Bookmark name"
                 },
-                "required": ["content"]
-            }
-        ),
-        Tool(
-            name="list_notes",
-            description="List all quick notes, optionally filtered by tag",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "tag": {
-                        "type": "string",
-                        "description": "Filter by tag (optional)"
-                    }
+                "target": {
+                    "type": "string",
+                    "description": "File path, URL, or command"
+                },
+                "type": {
+                    "type": "string",
+                    "description": "Type: 'file', 'url', or 'command'"
+                },
+                "tags": {
+                    "type": "string",
+                    "description": "Comma-separated tags (optional)"
                 }
-            }
-        ),
-        Tool(
-            name="delete_note",
-            description="Delete a note by its ID",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "note_id": {
-                        "type": "string",
-                        "description": "Note ID to delete"
-                    }
+            },
+            "required": ["name", "target", "type"]
+        }
+    ),
+    Tool(
+        name="bookmark_list",
+        description="List all bookmarks, optionally filtered by tag or type",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tag": {
+                    "type": "string",
+                    "description": "Filter by tag (optional)"
                 },
-                "required": ["note_id"]
+                "type": {
+                    "type": "string",
+                    "description": "Filter by type: 'file', 'url', or 'command' (optional)"
+                }
             }
-        ),
-        Tool(
-            name="bookmark_add",
-            description="Add a bookmark (file path, URL, or command)",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Bookmark name"
-                    },
-                    "target": {
-                        "type": "string",
-                        "description": "File path, URL, or command"
-                    },
-                    "type": {
-                        "type": "string",
-                        "description": "Type: 'file', 'url', or 'command'"
-                    },
-                    "tags": {
-                        "type": "string",
-                        "description": "Comma-separated tags (optional)"
-                    }
+        }
+    ),
+    Tool(
+        name="bookmark_open",
+        description="Open a bookmark by name",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Bookmark name"
                 },
-                "required": ["name", "target", "type"]
-            }
-        ),
-        Tool(
-            name="bookmark_list",
-            description="List all bookmarks, optionally filtered by tag or type",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "tag": {
-                        "type": "string",
-                        "description": "Filter by tag (optional)"
-                    },
-                    "type": {
-                        "type": "string",
-                        "description": "Filter by type: 'file', 'url', or 'command' (optional)"
-                    }
+                "confirm": {
+                    "type": "boolean",
+                    "description": "Required for command bookmarks"
                 }
-            }
-        ),
-        Tool(
-            name="bookmark_open",
-            description="Open a bookmark by name",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Bookmark name"
-                    },
-                    "confirm": {
-                        "type": "boolean",
-                        "description": "Required for command bookmarks"
-                    }
+            },
+            "required": ["name"]
+        }
+    ),
+    Tool(
+        name="open_file_location",
+        description="Open a file or folder in Windows Explorer",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "File or folder path"
+                }
+            },
+            "required": ["path"]
+        }
+    ),
+    Tool(
+        name="recent_files",
+        description="List recently modified files in a directory",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string",
+                    "description": "Directory to search"
                 },
-                "required": ["name"]
-            }
-        ),
-        Tool(
-            name="open_file_location",
-            description="Open a file or folder in Windows Explorer",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "File or folder path"
-                    }
+                "hours": {
+                    "type": "number",
+                    "description": "Look back this many hours (default: 24)"
                 },
-                "required": ["path"]
-            }
-        ),
-        Tool(
-            name="recent_files",
-            description="List recently modified files in a directory",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "directory": {
-                        "type": "string",
-                        "description": "Directory to search"
-                    },
-                    "hours": {
-                        "type": "number",
-                        "description": "Look back this many hours (default: 24)"
-                    },
-                    "extension": {
-                        "type": "string",
-                        "description": "Filter by file extension (e.g., '.py', '.txt')"
-                    }
+                "extension": {
+                    "type": "string",
+                    "description": "Filter by file extension (e.g., '.py', '.txt')"
                 }
             }
-        ),
-        Tool(
-            name="create_workspace",
-            description="Create a new project workspace with common folders",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Base path for the workspace"
-                    },
-                    "name": {
-                        "type": "string",
-                        "description": "Workspace name"
-                    },
-                    "folders": {
-                        "type": "string",
-                        "description": "Comma-separated folder names (default: 'src,docs,tests')"
-                    }
+        }
+    ),
+    Tool(
+        name="create_workspace",
+        description="Create a new project workspace with common folders",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "path": {
+                    "type": "string",
+                    "description": "Base path for the workspace"
                 },
-                "required": ["path", "name"]
-            }
-        )
-    ]
+                "name": {
+                    "type": "string",
+                    "description": "Workspace name"
+                },
+                "folders": {
+                    "type": "string",
+                    "description": "Comma-separated folder names (default: 'src,docs,tests')"
+                }
+            },
+            "required": ["path", "name"]
+        }
+    )
+]
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List all available tools"""
+    return TOOLS
+
+# Parsed contents of each store with the (st_mtime_ns, st_size) they were
+# read at, so a tool call only re-reads a file after it changed on disk.
+# The last slot holds the store's lookup index, built on first use.
+_CACHE: dict[Path, tuple[int, int, list, dict | None]] = {}
+_CACHE_LOCK = threading.Lock()
+
+def _load_cached(filepath: Path) -> tuple | None:
+    """The file's cache entry, (re)loaded if needed; None if missing or unreadable"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    with _CACHE_LOCK:
+        cached = _CACHE.get(filepath)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached
+    try:
+        # The whole file is read in one call, so skip the BufferedReader copy
+        with open(filepath, 'rb', buffering=0) as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except:
+        return None
+    cached = (st.st_mtime_ns, st.st_size, data, None)
+    with _CACHE_LOCK:
+        _CACHE[filepath] = cached
+    return cached
 
 def load_json_file(filepath: Path) -> list:
-    """Load JSON file or return empty list"""
-    if filepath.exists():
+    """Load JSON file or return empty list (cached until the file changes)"""
+    cached = _load_cached(filepath)
+    return list(cached[2]) if cached is not None else []
+
+def load_json_indexed(filepath: Path, build_index) -> tuple[list, dict]:
+    """load_json_file plus build_index(data), rebuilt only when the file changes.
+    
+    Handlers that save through save_json_file(..., index) keep the index in
+    step themselves; a save without one makes the next load rebuild it.
+    """
+    cached = _load_cached(filepath)
+    if cached is None:
+        return [], build_index([])
+    mtime_ns, size, data, index = cached
+    if index is None:
+        index = build_index(data)
+        with _CACHE_LOCK:
+            if _CACHE.get(filepath) is cached:
+                _CACHE[filepath] = (mtime_ns, size, data, index)
+    return list(data), index
+
+def save_json_file(filepath: Path, data: list, index: dict | None = None):
+    """Save data to JSON file (atomic write); a no-op if the file already holds it"""
+    with _CACHE_LOCK:
+        cached = _CACHE.get(filepath)
+    if cached is not None and cached[2] == data:
+        # Comparing with what was last read or written is cheaper than
+        # encoding the payload; the stat makes sure the file still holds it
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
-    return []
-
-def save_json_file(filepath: Path, data: list):
-    """Save data to JSON file (atomic write)"""
+            st = os.stat(filepath)
+        except OSError:
+            st = None
+        if st is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            if index is not None:
+                with _CACHE_LOCK:
+                    _CACHE[filepath] = (*cached[:3], index)
+            return
     tmp_path = filepath.with_suffix(filepath.suffix + ".tmp")
-    with open(tmp_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+    else:
+        # json.dump streams chunks through a 64 KiB buffer instead of
+        # building the whole document as one string first
+        with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
     os.replace(tmp_path, filepath)
+    # What was just written is what the next load would parse
+    st = os.stat(filepath)
+    with _CACHE_LOCK:
+        _CACHE[filepath] = (st.st_mtime_ns, st.st_size, list(data), index)
+
+# Clipboard history is an append-only JSON-lines log, oldest entry first, so
+# recording a copy writes one line instead of rewriting the whole history.
+# Once the log holds more than twice HISTORY_LIMIT lines it is compacted
+# back down to the newest HISTORY_LIMIT. New entries are buffered in memory
+# and flushed every FLUSH_INTERVAL seconds (and at exit), so a burst of
+# copies costs one write. The newest HISTORY_LIMIT entries also live in a
+# bounded newest-first deque, which serves clipboard_history and the dedup
+# check without touching the file.
+FLUSH_INTERVAL = 0.5
+_HISTORY_LOCK = threading.Lock()
+_history_lines: int | None = None  # Lines in the log, counted on first use
+_recent: deque[dict] = deque(maxlen=HISTORY_LIMIT)  # Newest first
+_pending: deque[dict] = deque()  # Entries not yet written to the log
+
+def _encode_line(entry: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+
+HISTORY_TAIL_BYTES = 64 << 10
+
+def _read_history() -> tuple[list[dict], int]:
+    """Parse the last HISTORY_LIMIT entries (oldest first) and count the log's lines.
+    
+    Only the end of the log is read, widening until it holds HISTORY_LIMIT
+    lines (the whole file at worst), so the count covers the part read. That
+    can only undercount, which just lets compaction come a little later.
+    """
+    try:
+        with open(CLIPBOARD_HISTORY, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            window = HISTORY_TAIL_BYTES
+            while True:
+                start = max(0, size - window)
+                f.seek(start)
+                lines = f.read().split(b"\n")
+                if start:
+                    lines = lines[1:]  # Starts mid-line
+                lines = [line for line in lines if line.strip()]
+                if start == 0 or len(lines) > HISTORY_LIMIT:
+                    break
+                window *= 4
+    except FileNotFoundError:
+        return [], 0
+    entries = []
+    for line in lines[-HISTORY_LIMIT:]:
+        try:
+            entries.append(orjson.loads(line) if orjson is not None else json.loads(line))
+        except ValueError:
+            continue  # Torn line
+    return entries, len(lines)
+
+def _write_history(entries) -> int:
+    """Replace the log with entries (oldest first); returns the line count."""
+    tmp_path = CLIPBOARD_HISTORY.with_suffix(CLIPBOARD_HISTORY.suffix + ".tmp")
+    lines = [_encode_line(entry) for entry in entries]
+    with open(tmp_path, 'wb') as f:
+        f.write(b"".join(lines))
+    os.replace(tmp_path, CLIPBOARD_HISTORY)
+    return len(lines)
+
+def _init_history():
+    """Count the log's lines and load the newest entries, once per process."""
+    global _history_lines
+    if _history_lines is not None:
+        return
+    if not CLIPBOARD_HISTORY.exists() and _LEGACY_CLIPBOARD_HISTORY.exists():
+        # Carry over the old newest-first JSON list
+        legacy = load_json_file(_LEGACY_CLIPBOARD_HISTORY)[:HISTORY_LIMIT]
+        _write_history(reversed(legacy))
+    entries, _history_lines = _read_history()
+    _recent.extendleft(entries)
+
+def load_history() -> list[dict]:
+    """Newest-first clipboard history, up to HISTORY_LIMIT entries"""
+    with _HISTORY_LOCK:
+        _init_history()
+        return list(_recent)
+
+def append_history(entry: dict, dedupe: bool = False):
+    """Queue a clipboard entry; with dedupe, skip it if it repeats the newest one"""
+    with _HISTORY_LOCK:
+        _init_history()
+        if dedupe and _recent and _recent[0].get("content") == entry["content"]:
+            return
+        _pending.append(entry)
+        _recent.appendleft(entry)
+
+def flush_history():
+    """Append every queued clipboard entry to the log in one write"""
+    global _history_lines
+    with _HISTORY_LOCK:
+        if not _pending:
+            return
+        with open(CLIPBOARD_HISTORY, 'ab') as f:
+            f.write(b"".join(map(_encode_line, _pending)))
+        # Only dropped once written, so a failed flush is retried next time
+        _history_lines += len(_pending)
+        _pending.clear()
+        if _history_lines > 2 * HISTORY_LIMIT:
+            # Everything is flushed, so the newest entries are exactly _recent
+            _history_lines = _write_history(reversed(_recent))
+
+async def _flush_history_periodically():
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        if _pending:
+            try:
+                await asyncio.to_thread(flush_history)
+            except OSError:
+                pass  # Kept queued; retried on the next tick
+
+atexit.register(flush_history)
+
+DISPLAY_FORMAT = "%Y-%m-%d %H:%M UTC"
+_UTC = timezone.utc
 
 def _now_utc_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    return datetime.now(_UTC).isoformat()
+
+def _now_utc_stamps() -> tuple[str, str]:
+    """(ISO timestamp, display timestamp) for now, from one clock read"""
+    now = datetime.now(_UTC)
+    return now.isoformat(), now.strftime(DISPLAY_FORMAT)
+
+def _display_ts(item: dict, field: str) -> str:
+    """The display timestamp saved with a record, else formatted from its ISO field"""
+    display = item.get("display_ts")
+    if display:
+        return display
+    return datetime.fromisoformat(item[field]).astimezone(_UTC).strftime(DISPLAY_FORMAT)
 
 def _normalize_tags(tags_value) -> list[str]:
+    """Tags in canonical (stripped, casefolded, interned) form"""
     if isinstance(tags_value, list):
         raw_tags = tags_value
     else:
         raw_tags = str(tags_value or "").split(",")
-    tags = [t.strip() for t in raw_tags if t and str(t).strip()]
+    tags = [sys.intern(str(t).strip().casefold()) for t in raw_tags if t and str(t).strip()]
     return tags
 
 def _tags_key(tags: list[str]) -> tuple:
-    return tuple(sorted([t.lower() for t in tags]))
+    return tuple(sorted(tags))
 
 def _content_key(content: str) -> str:
     return content.strip().casefold()
 
-@server.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Handle tool execution"""
+def _note_key(note: dict) -> tuple:
+    return _content_key(note.get("content", "")), _tags_key(note.get("tags", []))
+
+def _canonicalize_tags(items: list):
+    """Bring tags saved before they were stored canonical into that form.
     
-    try:
-        if name == "clipboard_read":
-            result = subprocess.run(
-                ["powershell", "-command", "Get-Clipboard"],
-                capture_output=True,
-                text=True
-            )
-            content = result.stdout.strip()
-            
-            # Save to history
-            history = load_json_file(CLIPBOARD_HISTORY)
-            if content and (not history or history[0].get("content") != content):
-                history.insert(0, {
-                    "content": content,
-                    "timestamp": _now_utc_iso()
-                })
-                history = history[:HISTORY_LIMIT]
-                save_json_file(CLIPBOARD_HISTORY, history)
-            
-            return [TextContent(type="text", text=content or "Clipboard is empty")]
-        
-        elif name == "clipboard_write":
-            text = arguments["text"]
-            subprocess.run(
-                ["powershell", "-command", f"Set-Clipboard -Value '{text}'"],
-                check=True
-            )
-            
-            # Save to history
-            history = load_json_file(CLIPBOARD_HISTORY)
-            history.insert(0, {
-                "content": text,
-                "timestamp": _now_utc_iso()
-            })
-            history = history[:HISTORY_LIMIT]
-            save_json_file(CLIPBOARD_HISTORY, history)
-            
-            return [TextContent(type="text", text=f"✓ Copied to clipboard: {text[:50]}...")]
-        
-        elif name == "clipboard_history":
-            history = load_json_file(CLIPBOARD_HISTORY)
-            if not history:
-                return [TextContent(type="text", text="No clipboard history")]
-            
-            output = "Clipboard History:\n" + "=" * 60 + "\n\n"
-            for i, item in enumerate(history[:HISTORY_LIMIT], 1):
-                timestamp = datetime.fromisoformat(item["timestamp"]).astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-                content = item["content"][:100]
-                output += f"{i}. [{timestamp}]\n{content}\n\n"
-            
-            return [TextContent(type="text", text=output)]
-        
-        elif name == "quick_note":
-            notes = load_json_file(QUICK_NOTES)
-            content = arguments["content"].strip()
-            if not content:
-                return [TextContent(type="text", text="Note content is empty")]
-
-            tags = _normalize_tags(arguments.get("tags", ""))
-            tags_key = _tags_key(tags)
-            content_key = _content_key(content)
-
-            for note in notes:
-                if _content_key(note.get("content", "")) == content_key and _tags_key(note.get("tags", [])) == tags_key:
-                    return [TextContent(type="text", text=f"Note already exists (ID: {note.get('id')})")]
-
-            note_id = uuid.uuid4().hex
-
-            note = {
-                "id": note_id,
-                "content": content,
-                "tags": tags,
-                "created": _now_utc_iso()
-            }
+    Runs on the cached list, so the next save writes the migrated tags.
+    """
+    for item in items:
+        tags = item.get("tags")
+        if tags:
+            item["tags"] = _normalize_tags(tags)
 
-            notes.insert(0, note)
-            save_json_file(QUICK_NOTES, notes)
-
-            return [TextContent(type="text", text=f"Note saved (ID: {note_id})")]
-
-        elif name == "list_notes":
-            notes = load_json_file(QUICK_NOTES)
-            tag_filter = arguments.get("tag", "").lower()
-            
-            if tag_filter:
-                notes = [n for n in notes if tag_filter in [t.lower() for t in n.get("tags", [])]]
-            
-            if not notes:
-                return [TextContent(type="text", text="No notes found")]
-            
-            output = f"Quick Notes ({len(notes)}):\n" + "=" * 60 + "\n\n"
-            for note in notes:
-                timestamp = datetime.fromisoformat(note["created"]).astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-                tags = ", ".join(note.get("tags", [])) or "no tags"
-                output += f"ID: {note['id']} | {timestamp} | [{tags}]\n"
-                output += f"{note['content']}\n\n"
-            
-            return [TextContent(type="text", text=output)]
-        
-        elif name == "delete_note":
-            notes = load_json_file(QUICK_NOTES)
-            note_id = arguments["note_id"]
-            
-            notes = [n for n in notes if n["id"] != note_id]
-            save_json_file(QUICK_NOTES, notes)
-            
-            return [TextContent(type="text", text=f"✓ Note {note_id} deleted")]
-        
-        elif name == "bookmark_add":
-            bookmarks = load_json_file(BOOKMARKS)
-            bm_type = arguments["type"].lower()
-            if bm_type not in {"file", "url", "command"}:
-                return [TextContent(type="text", text="Invalid bookmark type. Use 'file', 'url', or 'command'.")]
-
-            name = arguments["name"].strip()
-            target = arguments["target"].strip()
-            if not name or not target:
-                return [TextContent(type="text", text="Bookmark name and target are required")]
-
-            for bm in bookmarks:
-                if bm.get("name", "").lower() == name.lower():
-                    return [TextContent(type="text", text=f"Bookmark name already exists: {name}")]
-                if bm.get("type", "").lower() == bm_type and bm.get("target", "") == target:
-                    return [TextContent(type="text", text=f"Bookmark target already exists for type '{bm_type}'")]
-
-            tags = _normalize_tags(arguments.get("tags", ""))
-
-            bookmark = {
-                "id": uuid.uuid4().hex,
-                "name": name,
-                "target": target,
-                "type": bm_type,
-                "tags": tags,
-                "created": _now_utc_iso()
-            }
+def _index_notes(notes: list) -> dict:
+    """(content key, tags key) -> ID of the first note with them, and
+    tag -> IDs of the notes carrying it"""
+    _canonicalize_tags(notes)
+    dedup = {}
+    tag_ids = {}
+    for note in notes:
+        dedup.setdefault(_note_key(note), note.get("id"))
+        for tag in note.get("tags", []):
+            tag_ids.setdefault(tag, set()).add(note.get("id"))
+    # Only stores from before dedup existed can hold repeated keys
+    return {"dedup": dedup, "tags": tag_ids, "repeats": len(dedup) < len(notes)}
 
-            bookmarks.append(bookmark)
-            save_json_file(BOOKMARKS, bookmarks)
-
-            return [TextContent(type="text", text=f"Bookmark '{name}' added")]
-
-        elif name == "bookmark_list":
-            bookmarks = load_json_file(BOOKMARKS)
-            tag_filter = arguments.get("tag", "").lower()
-            type_filter = arguments.get("type", "").lower()
-            
-            if tag_filter:
-                bookmarks = [b for b in bookmarks if tag_filter in [t.lower() for t in b.get("tags", [])]]
-            if type_filter:
-                if type_filter not in {"file", "url", "command"}:
-                    return [TextContent(type="text", text="Invalid type filter. Use 'file', 'url', or 'command'.")]
-                bookmarks = [b for b in bookmarks if b["type"].lower() == type_filter]
-            
-            if not bookmarks:
-                return [TextContent(type="text", text="No bookmarks found")]
-            
-            output = f"Bookmarks ({len(bookmarks)}):\n" + "=" * 60 + "\n\n"
-            for bm in bookmarks:
-                tags = ", ".join(bm.get("tags", [])) or "no tags"
-                output += f"📌 {bm['name']} [{bm['type']}]\n"
-                output += f"   {bm['target']}\n"
-                output += f"   Tags: {tags}\n\n"
-            
-            return [TextContent(type="text", text=output)]
-        
-        elif name == "bookmark_open":
-            bookmarks = load_json_file(BOOKMARKS)
-            name = arguments["name"]
-            
-            bookmark = next((b for b in bookmarks if b["name"].lower() == name.lower()), None)
-            if not bookmark:
-                return [TextContent(type="text", text=f"Bookmark '{name}' not found")]
-            
-            target = bookmark["target"]
-            bm_type = bookmark["type"].lower()
-            
-            if bm_type == "file":
-                subprocess.run(["explorer", target])
-            elif bm_type == "url":
-                subprocess.run(["start", target], shell=True)
-            elif bm_type == "command":
-                if not arguments.get("confirm", False):
-                    return [TextContent(type="text", text="Confirmation required: set confirm=true to run command bookmark")]
-                subprocess.run(target, shell=True)
-            
-            return [TextContent(type="text", text=f"✓ Opened bookmark: {name}")]
-        
-        elif name == "open_file_location":
-            path = arguments["path"]
-            if os.path.exists(path):
-                subprocess.run(["explorer", "/select,", path])
-                return [TextContent(type="text", text=f"✓ Opened location: {path}")]
-            else:
-                return [TextContent(type="text", text=f"Path not found: {path}")]
-        
-        elif name == "recent_files":
-            directory = arguments.get("directory", ".")
-            hours = arguments.get("hours", 24)
-            extension = arguments.get("extension", "")
-            
-            cutoff_time = datetime.now().timestamp() - (hours * 3600)
-            recent = []
-            
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    if extension and not file.endswith(extension):
+def _index_bookmarks(bookmarks: list) -> dict:
+    """Positions of the first bookmark per lowercased name and per (type, target),
+    and of every bookmark per tag"""
+    _canonicalize_tags(bookmarks)
+    names = {}
+    targets = {}
+    tag_positions = {}
+    for i, bm in enumerate(bookmarks):
+        names.setdefault(bm.get("name", "").lower(), i)
+        targets.setdefault((bm.get("type", "").lower(), bm.get("target", "")), i)
+        for tag in bm.get("tags", []):
+            tag_positions.setdefault(tag, set()).add(i)
+    return {"names": names, "targets": targets, "tags": tag_positions}
+
+def _open_clipboard() -> bool:
+    """Open the clipboard, retrying briefly if another app holds it"""
+    for _ in range(5):
+        try:
+            win32clipboard.OpenClipboard(0)
+            return True
+        except Exception:
+            time.sleep(0.02)
+    return False
+
+def read_clipboard() -> str:
+    """Clipboard text ("" if it holds none)"""
+    if win32clipboard is not None and _open_clipboard():
+        try:
+            if not win32clipboard.IsClipboardFormatAvailable(win32con.CF_UNICODETEXT):
+                return ""
+            return win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
+        finally:
+            win32clipboard.CloseClipboard()
+    result = subprocess.run(
+        ["powershell", "-NoProfile", "-command", "Get-Clipboard"],
+        capture_output=True,
+        text=True
+    )
+    return result.stdout
+
+def write_clipboard(text: str):
+    """Replace the clipboard contents with text"""
+    if win32clipboard is not None and _open_clipboard():
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardData(win32con.CF_UNICODETEXT, text)
+        finally:
+            win32clipboard.CloseClipboard()
+        return
+    # The text goes over stdin, never into the script, so quotes in it
+    # can't break out and run as PowerShell
+    subprocess.run(
+        [
+            "powershell", "-NoProfile", "-command",
+            "[Console]::InputEncoding = [Text.Encoding]::UTF8; "
+            "Set-Clipboard -Value ([Console]::In.ReadToEnd())"
+        ],
+        input=text,
+        encoding="utf-8",
+        check=True
+    )
+
+RECENT_FILES_SHOWN = 30
+
+def _newest_files(files, n: int) -> tuple[list, int]:
+    """The n newest (mtime, path) pairs, newest first, plus how many there were.
+    
+    Streams through a heap, so only n matches are held however many there are.
+    """
+    total = 0
+    def counted():
+        nonlocal total
+        for item in files:
+            total += 1
+            yield item
+    newest = heapq.nlargest(n, counted(), key=lambda item: item[0])
+    return newest, total
+
+def _iter_recent_files(directory: str, cutoff_time: float, extension: str):
+    """Yield (mtime, path) for files under directory modified after cutoff_time.
+    
+    Walks top-down like os.walk (directory symlinks are not followed), but
+    checks the extension on the entry name before stat()ing, and takes the
+    stat from the DirEntry, which Windows fills in from the listing itself.
+    """
+    stack = [directory]
+    while stack:
+        subdirs = []
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                    if extension and not entry.name.endswith(extension):
                         continue
-                    
-                    filepath = os.path.join(root, file)
                     try:
-                        mtime = os.path.getmtime(filepath)
-                        if mtime > cutoff_time:
-                            recent.append({
-                                "path": filepath,
-                                "modified": datetime.fromtimestamp(mtime)
-                            })
-                    except:
-                        pass
-            
-            recent.sort(key=lambda x: x["modified"], reverse=True)
-            
-            if not recent:
-                return [TextContent(type="text", text=f"No files modified in last {hours} hours")]
-            
-            output = f"Recent Files (last {hours}h):\n" + "=" * 60 + "\n\n"
-            for item in recent[:30]:
-                timestamp = item["modified"].strftime("%Y-%m-%d %H:%M")
-                output += f"[{timestamp}] {item['path']}\n"
-            
-            if len(recent) > 30:
-                output += f"\n... and {len(recent) - 30} more files"
-            
-            return [TextContent(type="text", text=output)]
-        
-        elif name == "create_workspace":
-            base_path = Path(arguments["path"])
-            workspace_name = arguments["name"]
-            folders = arguments.get("folders", "src,docs,tests").split(",")
-            
-            workspace_path = base_path / workspace_name
-            workspace_path.mkdir(parents=True, exist_ok=True)
-            
-            created = []
-            for folder in folders:
-                folder = folder.strip()
-                if folder:
-                    folder_path = workspace_path / folder
-                    folder_path.mkdir(exist_ok=True)
-                    created.append(folder)
-            
-            # Create a README
-            readme = workspace_path / "README.md"
-            readme.write_text(f"# {workspace_name}\n\nCreated: {datetime.now().strftime('%Y-%m-%d')}\n")
-            
-            output = f"✓ Workspace created: {workspace_path}\n\n"
-            output += "Folders created:\n"
-            for folder in created:
-                output += f"  - {folder}/\n"
-            output += "  - README.md\n"
-            
-            return [TextContent(type="text", text=output)]
-        
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if mtime > cutoff_time:
+                        yield mtime, entry.path
+        except OSError:
+            continue  # Unreadable directory, skipped like os.walk does
+        stack.extend(reversed(subdirs))
+
+# Serializes the read-modify-write tools per process, since they now run in
+# worker threads and two of them could otherwise drop each other's change
+_STORE_WRITE_LOCK = threading.Lock()
+
+def _add_note(arguments: dict) -> str:
+    """quick_note: insert a note unless one with the same content and tags exists"""
+    content = arguments["content"].strip()
+    if not content:
+        return "Note content is empty"
+
+    tags = _normalize_tags(arguments.get("tags", ""))
+    key = (_content_key(content), _tags_key(tags))
+
+    with _STORE_WRITE_LOCK:
+        notes, index = load_json_indexed(QUICK_NOTES, _index_notes)
+        if key in index["dedup"]:
+            return f"Note already exists (ID: {index['dedup'][key]})"
+
+        note_id = uuid.uuid4().hex
+        created, display_ts = _now_utc_stamps()
+
+        note = {
+            "id": note_id,
+            "content": content,
+            "tags": tags,
+            "created": created,
+            "display_ts": display_ts
+        }
+
+        notes.insert(0, note)
+        save_json_file(QUICK_NOTES, notes, index)
+        index["dedup"][key] = note_id
+        for tag in tags:
+            index["tags"].setdefault(tag, set()).add(note_id)
+
+    return f"Note saved (ID: {note_id})"
+
+def _delete_note(note_id: str) -> str:
+    """delete_note: drop the note with note_id"""
+    with _STORE_WRITE_LOCK:
+        # Loaded through the index so tags are canonical before saving
+        notes, index = load_json_indexed(QUICK_NOTES, _index_notes)
+        kept = [n for n in notes if n["id"] != note_id]
+        if len(kept) != len(notes):
+            if index["repeats"]:
+                # Another note may share the key; let the next load rebuild
+                save_json_file(QUICK_NOTES, kept)
+            else:
+                save_json_file(QUICK_NOTES, kept, index)
+                for note in notes:
+                    if note["id"] == note_id:
+                        index["dedup"].pop(_note_key(note), None)
+                        for tag in note.get("tags", []):
+                            index["tags"].get(tag, set()).discard(note_id)
+
+    return f"✓ Note {note_id} deleted"
+
+def _add_bookmark(arguments: dict) -> str:
+    """bookmark_add: append a bookmark unless its name or target is taken"""
+    bm_type = arguments["type"].lower()
+    if bm_type not in {"file", "url", "command"}:
+        return "Invalid bookmark type. Use 'file', 'url', or 'command'."
+
+    name = arguments["name"].strip()
+    target = arguments["target"].strip()
+    if not name or not target:
+        return "Bookmark name and target are required"
+
+    tags = _normalize_tags(arguments.get("tags", ""))
+
+    with _STORE_WRITE_LOCK:
+        bookmarks, index = load_json_indexed(BOOKMARKS, _index_bookmarks)
+
+        # Whichever clash comes first in the list is the one reported
+        name_at = index["names"].get(name.lower())
+        target_at = index["targets"].get((bm_type, target))
+        if name_at is not None and (target_at is None or name_at <= target_at):
+            return f"Bookmark name already exists: {name}"
+        if target_at is not None:
+            return f"Bookmark target already exists for type '{bm_type}'"
+
+        bookmark = {
+            "id": uuid.uuid4().hex,
+            "name": name,
+            "target": target,
+            "type": bm_type,
+            "tags": tags,
+            "created": _now_utc_iso()
+        }
+
+        bookmarks.append(bookmark)
+        save_json_file(BOOKMARKS, bookmarks, index)
+        position = len(bookmarks) - 1
+        index["names"][name.lower()] = position
+        index["targets"][(bm_type, target)] = position
+        for tag in tags:
+            index["tags"].setdefault(tag, set()).add(position)
+
+    return f"Bookmark '{name}' added"
+
+def _create_workspace(workspace_path: Path, workspace_name: str, folders: list[str]):
+    """create_workspace: make the folders and README"""
+    workspace_path.mkdir(parents=True, exist_ok=True)
+    base = os.fspath(workspace_path)
+    
+    for folder in folders:
+        # Just try mkdir; only an existing path costs an extra stat
+        folder_path = os.path.join(base, folder)
+        try:
+            os.mkdir(folder_path)
+        except FileExistsError:
+            if not os.path.isdir(folder_path):
+                raise
+    
+    # Create a README
+    today = datetime.now().strftime('%Y-%m-%d')
+    readme = f"# {workspace_name}\n\nCreated: {today}\n".encode("utf-8")
+    (workspace_path / "README.md").write_bytes(readme)
+
+async def _run_process(*args: str):
+    """Run a program and wait for it without blocking the event loop"""
+    proc = await asyncio.create_subprocess_exec(*args)
+    await proc.wait()
+
+async def _run_shell(command: str):
+    """Run a shell command and wait for it without blocking the event loop"""
+    proc = await asyncio.create_subprocess_shell(command)
+    await proc.wait()
+
+# One handler per tool; call_tool dispatches through TOOL_HANDLERS
+
+async def handle_clipboard_read(arguments: dict) -> list[TextContent]:
+    content = (await asyncio.to_thread(read_clipboard)).strip()
+    
+    # Save to history
+    if content:
+        timestamp, display_ts = _now_utc_stamps()
+        await asyncio.to_thread(append_history, {
+            "content": content,
+            "timestamp": timestamp,
+            "display_ts": display_ts
+        }, dedupe=True)
+    
+    return [TextContent(type="text", text=content or "Clipboard is empty")]
+
+async def handle_clipboard_write(arguments: dict) -> list[TextContent]:
+    text = arguments["text"]
+    await asyncio.to_thread(write_clipboard, text)
+    
+    # Save to history
+    timestamp, display_ts = _now_utc_stamps()
+    await asyncio.to_thread(append_history, {
+        "content": text,
+        "timestamp": timestamp,
+        "display_ts": display_ts
+    })
+    
+    return [TextContent(type="text", text=f"✓ Copied to clipboard: {text[:50]}...")]
+
+async def handle_clipboard_history(arguments: dict) -> list[TextContent]:
+    history = await asyncio.to_thread(load_history)
+    if not history:
+        return [TextContent(type="text", text="No clipboard history")]
+    
+    rows = [
+        f"{i}. [{_display_ts(item, 'timestamp')}]\n{item['content'][:100]}\n\n"
+        for i, item in enumerate(history[:HISTORY_LIMIT], 1)
+    ]
+    header = "Clipboard History:\n" + "=" * 60 + "\n\n"
+    return [TextContent(type="text", text=header + "".join(rows))]
+
+async def handle_quick_note(arguments: dict) -> list[TextContent]:
+    text = await asyncio.to_thread(_add_note, arguments)
+    return [TextContent(type="text", text=text)]
+
+async def handle_list_notes(arguments: dict) -> list[TextContent]:
+    notes, index = await asyncio.to_thread(load_json_indexed, QUICK_NOTES, _index_notes)
+    tag_filter = arguments.get("tag", "").strip().casefold()
+    
+    if tag_filter:
+        ids = index["tags"].get(tag_filter, ())
+        notes = [n for n in notes if n["id"] in ids] if ids else []
+    
+    if not notes:
+        return [TextContent(type="text", text="No notes found")]
+    
+    rows = [
+        f"ID: {note['id']} | {_display_ts(note, 'created')} | "
+        f"[{', '.join(note.get('tags', [])) or 'no tags'}]\n{note['content']}\n\n"
+        for note in notes
+    ]
+    header = f"Quick Notes ({len(notes)}):\n" + "=" * 60 + "\n\n"
+    return [TextContent(type="text", text=header + "".join(rows))]
+
+async def handle_delete_note(arguments: dict) -> list[TextContent]:
+    text = await asyncio.to_thread(_delete_note, arguments["note_id"])
+    return [TextContent(type="text", text=text)]
+
+async def handle_bookmark_add(arguments: dict) -> list[TextContent]:
+    text = await asyncio.to_thread(_add_bookmark, arguments)
+    return [TextContent(type="text", text=text)]
+
+async def handle_bookmark_list(arguments: dict) -> list[TextContent]:
+    bookmarks, index = await asyncio.to_thread(load_json_indexed, BOOKMARKS, _index_bookmarks)
+    tag_filter = arguments.get("tag", "").strip().casefold()
+    type_filter = arguments.get("type", "").lower()
+    
+    if tag_filter:
+        positions = sorted(index["tags"].get(tag_filter, ()))
+        bookmarks = [bookmarks[i] for i in positions]
+    if type_filter:
+        if type_filter not in {"file", "url", "command"}:
+            return [TextContent(type="text", text="Invalid type filter. Use 'file', 'url', or 'command'.")]
+        bookmarks = [b for b in bookmarks if b["type"].lower() == type_filter]
+    
+    if not bookmarks:
+        return [TextContent(type="text", text="No bookmarks found")]
+    
+    rows = [
+        f"📌 {bm['name']} [{bm['type']}]\n   {bm['target']}\n"
+        f"   Tags: {', '.join(bm.get('tags', [])) or 'no tags'}\n\n"
+        for bm in bookmarks
+    ]
+    header = f"Bookmarks ({len(bookmarks)}):\n" + "=" * 60 + "\n\n"
+    return [TextContent(type="text", text=header + "".join(rows))]
+
+async def handle_bookmark_open(arguments: dict) -> list[TextContent]:
+    bookmarks, index = await asyncio.to_thread(load_json_indexed, BOOKMARKS, _index_bookmarks)
+    name = arguments["name"]
+    
+    position = index["names"].get(name.lower())
+    bookmark = bookmarks[position] if position is not None else None
+    if not bookmark:
+        return [TextContent(type="text", text=f"Bookmark '{name}' not found")]
+    
+    target = bookmark["target"]
+    bm_type = bookmark["type"].lower()
+    
+    if bm_type == "file":
+        await _run_process("explorer", target)
+    elif bm_type == "url":
+        await _run_shell(subprocess.list2cmdline(["start", target]))
+    elif bm_type == "command":
+        if not arguments.get("confirm", False):
+            return [TextContent(type="text", text="Confirmation required: set confirm=true to run command bookmark")]
+        await _run_shell(target)
+    
+    return [TextContent(type="text", text=f"✓ Opened bookmark: {name}")]
+
+async def handle_open_file_location(arguments: dict) -> list[TextContent]:
+    path = arguments["path"]
+    if await asyncio.to_thread(os.path.exists, path):
+        await _run_process("explorer", "/select,", path)
+        return [TextContent(type="text", text=f"✓ Opened location: {path}")]
+    else:
+        return [TextContent(type="text", text=f"Path not found: {path}")]
+
+async def handle_recent_files(arguments: dict) -> list[TextContent]:
+    directory = arguments.get("directory", ".")
+    hours = arguments.get("hours", 24)
+    extension = arguments.get("extension", "")
+    
+    cutoff_time = time.time() - (hours * 3600)
+    recent, total = await asyncio.to_thread(
+        _newest_files,
+        _iter_recent_files(directory, cutoff_time, extension),
+        RECENT_FILES_SHOWN
+    )
+    
+    if not recent:
+        return [TextContent(type="text", text=f"No files modified in last {hours} hours")]
+    
+    rows = [f"Recent Files (last {hours}h):\n" + "=" * 60 + "\n\n"]
+    # Local aliases: the comprehension runs once per listed file
+    strftime, localtime = time.strftime, time.localtime
+    rows += [f"[{strftime('%Y-%m-%d %H:%M', localtime(mtime))}] {filepath}\n" for mtime, filepath in recent]
+    
+    if total > RECENT_FILES_SHOWN:
+        rows.append(f"\n... and {total - RECENT_FILES_SHOWN} more files")
+    
+    return [TextContent(type="text", text="".join(rows))]
+
+async def handle_create_workspace(arguments: dict) -> list[TextContent]:
+    base_path = Path(arguments["path"])
+    workspace_name = arguments["name"]
+    folders = [f.strip() for f in arguments.get("folders", "src,docs,tests").split(",") if f.strip()]
+    
+    workspace_path = base_path / workspace_name
+    await asyncio.to_thread(_create_workspace, workspace_path, workspace_name, folders)
+    
+    rows = [f"✓ Workspace created: {workspace_path}\n\n"]
+    rows.append("Folders created:\n")
+    for folder in folders:
+        rows.append(f"  - {folder}/\n")
+    rows.append("  - README.md\n")
     
+    return [TextContent(type="text", text="".join(rows))]
+
+TOOL_HANDLERS = {
+    "clipboard_read": handle_clipboard_read,
+    "clipboard_write": handle_clipboard_write,
+    "clipboard_history": handle_clipboard_history,
+    "quick_note": handle_quick_note,
+    "list_notes": handle_list_notes,
+    "delete_note": handle_delete_note,
+    "bookmark_add": handle_bookmark_add,
+    "bookmark_list": handle_bookmark_list,
+    "bookmark_open": handle_bookmark_open,
+    "open_file_location": handle_open_file_location,
+    "recent_files": handle_recent_files,
+    "create_workspace": handle_create_workspace,
+}
+
+@server.call_tool()
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Handle tool execution"""
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    
+    try:
+        return await handler(arguments)
     except Exception as e:
         return [TextContent(type="text", text=f"Error in {name}: {type(e).__name__} - {str(e)}")]
 
 async def main():
     """Run the MCP server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # Exit through SystemExit on SIGTERM so queued history still gets flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    flusher = asyncio.create_task(_flush_history_periodically())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        flusher.cancel()
+        flush_history()
 
 if __name__ == "__main__":
     asyncio.run(main())